@@ -0,0 +1,130 @@
+"""
+Saved applicant clusters for the recruiter clusters map.
+
+An ApplicantClusterSnapshot holds, for one recruiter across all their jobs
+(``job`` is null) or for one of their jobs, a JSON ``state`` of
+
+    {"applicants": [[user_id, username, lat, lng], ...],  # first-application order
+     "clusters": [...],                                   # GridClusterer.clusters
+     "total_applications": n}
+
+Applicants are clustered in the order of their first application, so a new
+applicant always comes last and is simply added to the saved clusterer:
+creating an Application updates the existing snapshots in place. Deleting
+an application or moving an applicant can reorder or reshape earlier
+clusters, so those drop the affected snapshots instead, and
+``get_snapshot`` rebuilds them on the next request. The
+``rebuild_applicant_clusters`` command rebuilds every snapshot.
+"""
+import hashlib
+import json
+
+from django.db import transaction
+from django.db.models import Min, Q
+
+from jobfinder.geo import GridClusterer
+from jobs.models import Application, Job
+from .models import ApplicantClusterSnapshot, Profile
+
+# 50 miles
+CLUSTER_RADIUS_KM = 80.47
+
+
+def _etag(state):
+    return hashlib.md5(json.dumps(state, separators=(',', ':')).encode()).hexdigest()
+
+
+def _add_applicant(state, clusterer, user_id, username, lat, lng):
+    if lat is not None and lng is not None:
+        lat, lng = float(lat), float(lng)
+        clusterer.add(user_id, lat, lng)
+    else:
+        lat = lng = None
+    state['applicants'].append([user_id, username, lat, lng])
+
+
+def build_state(recruiter_id, job_id=None):
+    """Cluster a recruiter's applicants from scratch"""
+    applications = Application.objects.filter(job__posted_by_id=recruiter_id)
+    if job_id is not None:
+        applications = applications.filter(job_id=job_id)
+    applicants = (
+        applications.values('applicant_id')
+        .annotate(first_application=Min('id'))
+        .order_by('first_application')
+        .values_list('applicant_id', 'applicant__username',
+                     'applicant__profile__latitude', 'applicant__profile__longitude')
+    )
+
+    state = {'applicants': [], 'clusters': [], 'total_applications': applications.count()}
+    clusterer = GridClusterer(CLUSTER_RADIUS_KM)
+    for user_id, username, lat, lng in applicants:
+        _add_applicant(state, clusterer, user_id, username, lat, lng)
+    state['clusters'] = clusterer.clusters
+    return state
+
+
+def rebuild(recruiter_id, job_id=None):
+    state = build_state(recruiter_id, job_id)
+    snapshot, _ = ApplicantClusterSnapshot.objects.update_or_create(
+        recruiter_id=recruiter_id, job_id=job_id,
+        defaults={'state': state, 'etag': _etag(state)},
+    )
+    return snapshot
+
+
+def get_snapshot(recruiter_id, job_id=None):
+    """The saved snapshot, built first if there is none"""
+    snapshot = ApplicantClusterSnapshot.objects.filter(recruiter_id=recruiter_id, job_id=job_id).first()
+    return snapshot or rebuild(recruiter_id, job_id)
+
+
+def rebuild_all():
+    """Rebuild the snapshots of every recruiter and job with applications; returns how many were written"""
+    ApplicantClusterSnapshot.objects.all().delete()
+    written = 0
+    jobs = Job.objects.filter(applications__isnull=False).distinct().values_list('id', 'posted_by_id')
+    recruiter_ids = set()
+    for job_id, recruiter_id in jobs.iterator():
+        rebuild(recruiter_id, job_id)
+        recruiter_ids.add(recruiter_id)
+        written += 1
+    for recruiter_id in recruiter_ids:
+        rebuild(recruiter_id)
+        written += 1
+    return written
+
+
+def _snapshots_for_job(job_id):
+    recruiter_id = Job.objects.filter(pk=job_id).values_list('posted_by_id', flat=True).first()
+    return ApplicantClusterSnapshot.objects.filter(recruiter_id=recruiter_id).filter(
+        Q(job__isnull=True) | Q(job_id=job_id)
+    )
+
+
+def application_created(application):
+    """Add a new application to the saved snapshots of its job and recruiter"""
+    coords = Profile.objects.filter(user_id=application.applicant_id).values_list('latitude', 'longitude').first()
+    lat, lng = coords or (None, None)
+    with transaction.atomic():
+        for snapshot in _snapshots_for_job(application.job_id).select_for_update():
+            state = snapshot.state
+            state['total_applications'] += 1
+            if not any(applicant[0] == application.applicant_id for applicant in state['applicants']):
+                clusterer = GridClusterer.from_clusters(CLUSTER_RADIUS_KM, state['clusters'])
+                _add_applicant(state, clusterer, application.applicant_id,
+                               application.applicant.username, lat, lng)
+            snapshot.etag = _etag(state)
+            snapshot.save(update_fields=['state', 'etag', 'updated_at'])
+
+
+def application_deleted(application):
+    _snapshots_for_job(application.job_id).delete()
+
+
+def applicant_moved(user_id):
+    """Drop every snapshot the applicant appears in"""
+    job_ids = Application.objects.filter(applicant_id=user_id).values('job_id')
+    ApplicantClusterSnapshot.objects.filter(
+        recruiter_id__in=Job.objects.filter(id__in=job_ids).values('posted_by_id')
+    ).filter(Q(job__isnull=True) | Q(job_id__in=job_ids)).delete()
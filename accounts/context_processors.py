@@ -0,0 +1,39 @@
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Message
+
+# Counts are dropped from the shared cache (settings.CACHES) as messages arrive or are
+# read, so every worker sees the change; the timeout only bounds a missed invalidation
+UNREAD_CACHE_SECONDS = 300
+
+
+def _unread_cache_key(user_id):
+    return f'unread_messages:{user_id}'
+
+
+def unread_message_count(user):
+    """Messages sent to ``user`` that they haven't read, cached until one arrives or is read"""
+    key = _unread_cache_key(user.id)
+    count = cache.get(key)
+    if count is None:
+        count = (
+            Message.objects.filter(is_read=False)
+            .filter(Q(conversation__recruiter=user) | Q(conversation__candidate=user))
+            .exclude(sender=user)
+            .count()
+        )
+        cache.set(key, count, UNREAD_CACHE_SECONDS)
+    return count
+
+
+def invalidate_unread_count(*user_ids):
+    cache.delete_many([_unread_cache_key(user_id) for user_id in user_ids])
+
+
+def unread_messages(request):
+    """Adds ``unread_message_count`` for the Messages badge in base.html"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'unread_message_count': lambda: unread_message_count(user)}
@@ -3,6 +3,7 @@ from .models import CustomUser
 from django import forms
 from .models import Profile, Skill, Project, Education, WorkExperience, Conversation, Message, SavedCandidateSearch
 from django.forms import formset_factory, modelformset_factory, TextInput, URLInput, Textarea, Select
+from django.urls import reverse_lazy
 
 class CustomUserCreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
@@ -14,9 +15,32 @@ class CustomUserChangeForm(UserChangeForm):
         model = CustomUser
         fields = ('username', 'email', 'role')
 
+class SkillTokenInput(forms.SelectMultiple):
+    """
+    Multiple select that only renders the chosen skills, so pages don't embed the
+    whole vocabulary; skill_tokens.js turns it into a token input fed by /api/skills/
+    """
+
+    def __init__(self, attrs=None):
+        super().__init__(attrs={
+            'class': 'skill-tokens',
+            'data-autocomplete-url': reverse_lazy('api.skills'),
+            **(attrs or {}),
+        })
+
+    def optgroups(self, name, value, attrs=None):
+        ids = [v for v in value if str(v).isdigit()]
+        all_choices = self.choices
+        self.choices = list(Skill.objects.filter(pk__in=ids).values_list('pk', 'name'))
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = all_choices
+
 class ProfileForm(forms.ModelForm):
     skills = forms.ModelMultipleChoiceField(
-        queryset=Skill.objects.all(), required=False, widget=forms.CheckboxSelectMultiple
+        queryset=Skill.objects.all(), required=False,
+        widget=SkillTokenInput(attrs={'data-new-skills-input': 'id_new_skills'})
     )
     new_skills = forms.CharField(required=False, help_text="Comma-separated new skills to add")
     commute_radius = forms.IntegerField(
@@ -118,7 +142,7 @@ class CandidateSearchForm(forms.Form):
     skills = forms.ModelMultipleChoiceField(
         queryset=Skill.objects.all(), 
         required=False, 
-        widget=forms.CheckboxSelectMultiple
+        widget=SkillTokenInput
     )
     location = forms.CharField(
         required=False, 
@@ -127,7 +151,7 @@ class CandidateSearchForm(forms.Form):
     project_keyword = forms.CharField(
         required=False, 
         widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g., React, Python, Machine Learning'}),
-        help_text="Search project titles/descriptions"
+        help_text="Search headlines, bios, projects and work experience"
     )
     match_all_skills = forms.BooleanField(
         required=False, 
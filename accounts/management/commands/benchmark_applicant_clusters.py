@@ -0,0 +1,86 @@
+"""
+Management command to benchmark the applicant clustering used by the
+applicant clusters map.
+
+Applicants are generated around a few dozen metro areas. The grid-indexed
+GridClusterer is timed at every size; the previous exhaustive algorithm
+(every applicant against every cluster, centre re-summed on each join) is
+timed up to --baseline-max applicants and its clusters are checked to be
+identical.
+
+Example: python manage.py benchmark_applicant_clusters --sizes 1000 10000 100000
+"""
+
+import random
+import time
+from math import radians, sin, cos, asin, sqrt
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobfinder.geo import GridClusterer
+
+CLUSTER_RADIUS_KM = 80.47
+
+
+def _exhaustive_clusters(points, radius_km):
+    """The original applicant_clusters_api algorithm"""
+    def haversine_km(lat1, lon1, lat2, lon2):
+        dlat = radians(lat2 - lat1)
+        dlon = radians(lon2 - lon1)
+        a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
+        return 2 * 6371.0 * asin(sqrt(a))
+
+    clusters = []
+    for key, lat, lng in points:
+        for cluster in clusters:
+            if haversine_km(cluster['center_lat'], cluster['center_lng'], lat, lng) <= radius_km:
+                cluster['members'].append((key, lat, lng))
+                count = len(cluster['members'])
+                cluster['center_lat'] = sum(m[1] for m in cluster['members']) / count
+                cluster['center_lng'] = sum(m[2] for m in cluster['members']) / count
+                break
+        else:
+            clusters.append({'center_lat': lat, 'center_lng': lng, 'members': [(key, lat, lng)]})
+    return [[m[0] for m in c['members']] for c in clusters]
+
+
+def _grid_clusters(points, radius_km):
+    clusterer = GridClusterer(radius_km)
+    for key, lat, lng in points:
+        clusterer.add(key, lat, lng)
+    return [c['keys'] for c in clusterer.clusters]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark grid-indexed applicant clustering against the exhaustive algorithm'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000])
+        parser.add_argument('--baseline-max', type=int, default=5000,
+                            help='Largest size to also run the quadratic algorithm on')
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        metros = [(rng.uniform(26, 48), rng.uniform(-123, -70)) for _ in range(40)]
+
+        self.stdout.write(f'{"applicants":>10} {"clusters":>9} {"grid ms":>9} {"exhaustive ms":>14}')
+        for size in options['sizes']:
+            points = []
+            for key in range(size):
+                lat, lng = rng.choice(metros)
+                points.append((key, lat + rng.gauss(0, 0.6), lng + rng.gauss(0, 0.6)))
+
+            start = time.perf_counter()
+            grid = _grid_clusters(points, CLUSTER_RADIUS_KM)
+            grid_ms = (time.perf_counter() - start) * 1000
+
+            exhaustive = ''
+            if size <= options['baseline_max']:
+                start = time.perf_counter()
+                expected = _exhaustive_clusters(points, CLUSTER_RADIUS_KM)
+                exhaustive = f'{(time.perf_counter() - start) * 1000:.1f}'
+                if expected != grid:
+                    raise CommandError(f'Grid clustering differs from the exhaustive result at {size} applicants')
+
+            self.stdout.write(f'{size:>10} {len(grid):>9} {grid_ms:>9.1f} {exhaustive:>14}')
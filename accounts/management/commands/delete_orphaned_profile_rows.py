@@ -0,0 +1,34 @@
+"""
+Management command to delete Project, Education and WorkExperience rows
+that no profile points to any more.
+
+Profile edits used to replace these rows on every save without deleting
+the old ones; run this once to clean up what they left behind.
+Example: python manage.py delete_orphaned_profile_rows --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from accounts.models import Project, Education, WorkExperience
+
+
+class Command(BaseCommand):
+    help = 'Delete projects, education and work experience not attached to any profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the orphaned rows',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for model in (Project, Education, WorkExperience):
+                orphans = model.objects.filter(profile__isnull=True)
+                label = model._meta.verbose_name_plural
+                if options['dry_run']:
+                    self.stdout.write(f'{orphans.count()} orphaned {label}')
+                else:
+                    deleted, _ = orphans.delete()
+                    self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} orphaned {label}'))
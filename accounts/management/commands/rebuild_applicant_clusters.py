@@ -0,0 +1,19 @@
+"""
+Management command to rebuild every saved applicant cluster snapshot.
+
+Snapshots are otherwise updated as applications come in and rebuilt on
+demand after deletions or applicant moves; run this after bulk imports or
+to warm them all offline.
+Example: python manage.py rebuild_applicant_clusters
+"""
+
+from django.core.management.base import BaseCommand
+from accounts import clusters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-recruiter and per-job applicant cluster snapshots'
+
+    def handle(self, *args, **options):
+        total = clusters.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} applicant cluster snapshot(s)'))
@@ -0,0 +1,18 @@
+"""
+Management command to rebuild the CandidateSearchDoc table.
+
+Documents are otherwise refreshed by signals as profiles, skills and
+projects change; run this after bulk imports or raw SQL edits.
+Example: python manage.py rebuild_candidate_search_docs
+"""
+
+from django.core.management.base import BaseCommand
+from accounts import search_docs
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the flattened candidate search documents from the profiles'
+
+    def handle(self, *args, **options):
+        total = search_docs.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} candidate search document(s)'))
@@ -0,0 +1,70 @@
+"""
+Management command to render the small/medium renditions of profile pictures.
+
+New uploads are rendered as they are saved; run this once to backfill
+pictures uploaded before renditions existed, or with --all after changing
+RENDITIONS or FORMATS in accounts.thumbnails. Decoding and resizing run in
+a pool of worker processes; the files and hashes are written from this
+process.
+Example: python manage.py render_profile_pictures --workers 4
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from accounts import thumbnails
+from accounts.models import Profile
+
+
+def _render(data):
+    try:
+        return thumbnails.render_renditions(data)
+    except OSError:
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Render profile picture renditions in a process pool (pictures without them, or --all)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-render pictures that already have renditions')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+        parser.add_argument('--batch-size', type=int, default=100, help='Pictures read into memory at a time')
+
+    def handle(self, *args, **options):
+        profiles = Profile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        if not options['all']:
+            profiles = profiles.filter(profile_picture_hash='')
+        profiles = list(profiles.order_by('pk').only('pk', 'profile_picture', 'profile_picture_hash'))
+
+        # Forked workers must not share this process's database connection
+        connections.close_all()
+        rendered = failed = 0
+        with ProcessPoolExecutor(max_workers=max(options['workers'], 1)) as pool:
+            batch_size = max(options['batch_size'], 1)
+            for start in range(0, len(profiles), batch_size):
+                batch, originals = [], []
+                for profile in profiles[start:start + batch_size]:
+                    try:
+                        with profile.profile_picture.open('rb') as picture:
+                            originals.append(picture.read())
+                    except OSError:
+                        self.stderr.write(f'Missing picture for profile {profile.pk}: {profile.profile_picture.name}')
+                        failed += 1
+                        continue
+                    batch.append(profile)
+
+                for profile, result in zip(batch, pool.map(_render, originals)):
+                    if result is None:
+                        self.stderr.write(f'Unreadable picture for profile {profile.pk}: {profile.profile_picture.name}')
+                        failed += 1
+                        continue
+                    digest, renditions = result
+                    thumbnails.save_renditions(renditions)
+                    thumbnails.set_picture_hash(profile, digest)
+                    rendered += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Rendered {rendered} profile picture(s), {failed} failed'))
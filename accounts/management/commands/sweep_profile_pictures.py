@@ -0,0 +1,94 @@
+"""
+Management command to delete stored profile pictures no profile references.
+
+Pictures are stored once per content (accounts.storage), so replacing a
+picture leaves the old file behind for other profiles that may share it.
+This counts the references to every stored file and deletes the files
+with none, along with renditions (accounts.thumbnails) of pictures no
+profile shows. Files younger than --min-age are kept, as an upload may
+not be committed to its profile yet. --adopt first moves pictures saved
+under their upload names (before content addressing) to content names,
+which folds byte-identical duplicates into one file.
+Example: python manage.py sweep_profile_pictures --adopt --dry-run
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts import thumbnails
+from accounts.models import Profile
+from accounts.storage import BLOB_NAME_RE, reference_counts, stored_files
+
+
+class Command(BaseCommand):
+    help = 'Delete profile pictures and renditions that no profile references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age', type=int, default=60, help='Keep files modified less than this many minutes ago')
+        parser.add_argument('--adopt', action='store_true', help='Move pictures stored under upload names to content names first')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be moved and deleted')
+
+    def handle(self, *args, **options):
+        field = Profile._meta.get_field('profile_picture')
+        storage = field.storage
+        upload_dir = field.upload_to.strip('/')
+        dry_run = options['dry_run']
+
+        if options['adopt']:
+            adopted = self.adopt(field, dry_run)
+            self.stdout.write(f'{"Would move" if dry_run else "Moved"} {adopted} picture(s) to content names')
+
+        cutoff = timezone.now() - timedelta(minutes=options['min_age'])
+        references = reference_counts()
+        live_hashes = set(
+            Profile.objects.exclude(profile_picture_hash='').values_list('profile_picture_hash', flat=True)
+        )
+
+        removable = []
+        for name in stored_files(storage, upload_dir):
+            if name.startswith(thumbnails.RENDITION_DIR + '/'):
+                # Renditions are named "<picture hash>-<size>.<ext>"
+                if name.rsplit('/', 1)[1].split('-', 1)[0] in live_hashes:
+                    continue
+            elif references[name]:
+                continue
+            if storage.get_modified_time(name) < cutoff:
+                removable.append(name)
+
+        freed = 0
+        for name in removable:
+            freed += storage.size(name)
+            if dry_run:
+                self.stdout.write(f'Would delete {name}')
+            else:
+                storage.delete(name)
+
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(removable)} unreferenced file(s), {freed / 1024:.0f} KiB; '
+            f'{len(references)} picture(s) in use'
+        ))
+
+    def adopt(self, field, dry_run):
+        storage = field.storage
+        legacy = (
+            Profile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            .values_list('pk', 'profile_picture')
+        )
+        adopted = 0
+        for pk, name in legacy.iterator():
+            if BLOB_NAME_RE.match(name):
+                continue
+            if not storage.exists(name):
+                self.stderr.write(f'Missing picture for profile {pk}: {name}')
+                continue
+            adopted += 1
+            if dry_run:
+                continue
+            with storage.open(name, 'rb') as picture:
+                blob_name = storage.save(name, picture)
+            # The content is unchanged, so its renditions still apply; the old file is swept below
+            Profile.objects.filter(pk=pk, profile_picture=name).update(profile_picture=blob_name)
+        return adopted
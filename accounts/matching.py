@@ -0,0 +1,157 @@
+"""
+Candidate recommendations for a recruiter's jobs (the "Matched Candidates by
+Job" panel of candidate_search).
+
+A public seeker profile matches a job when at least MIN_OVERLAP of its
+skills appear in the job's skills (case-insensitively). Rather than
+comparing every profile with every job in Python, the skill names used by
+the recruiter's jobs are interned to column numbers, jobs and profiles
+become 0/1 matrices over those columns, and one matrix product gives the
+overlap of every (profile, job) pair. Only the recruiter's own skill
+vocabulary is involved, so the matrices stay narrow however many skills
+exist overall.
+
+The top MATCHES_PER_JOB profile ids per job are cached per recruiter.
+Entries are dropped when the recruiter's jobs change and go stale together
+when any profile, its skills or a skill changes (``bump_profile_version``).
+The version lives in the default cache, which settings.CACHES shares
+between worker processes, so a bump reaches them all. Each bump also records
+which profiles it covers, so in-process indexes built from the profiles
+(accounts.skill_postings) can catch up by reloading just those
+(``changed_profiles``).
+"""
+import time
+
+import numpy as np
+from django.core.cache import cache
+
+from jobs.models import JobSkill
+from jobs.recommendations import MIN_OVERLAP
+
+MATCHES_PER_JOB = 10
+
+MATCHES_CACHE_SECONDS = 3600
+
+_PROFILE_VERSION_KEY = 'candidate_profiles:version'
+
+# Seconds each bump's profile ids are kept. An index further behind than this
+# has outlived its own TTL and reloads in full anyway.
+PROFILE_CHANGES_SECONDS = 3600
+
+# Bumps ``changed_profiles`` will look up at once before a full reload is cheaper
+MAX_TRACKED_CHANGES = 100
+
+
+def _initial_version():
+    # The counter can be culled from the cache while keys built from it survive; starting
+    # again from the clock (in microseconds) never reuses a value those keys carry
+    return time.time_ns() // 1000
+
+
+def profile_version():
+    """Counter bumped whenever searchable profile data changes; part of candidate cache keys"""
+    version = cache.get(_PROFILE_VERSION_KEY)
+    if version is None:
+        cache.add(_PROFILE_VERSION_KEY, _initial_version(), None)
+        # Another worker may have added it first
+        version = cache.get(_PROFILE_VERSION_KEY)
+    return version
+
+
+def _changes_cache_key(version):
+    return f'candidate_profiles:changes:{version}'
+
+
+def bump_profile_version(profile_ids=()):
+    """Move the version on; ``profile_ids`` are the profiles whose search data changed, if any"""
+    try:
+        version = cache.incr(_PROFILE_VERSION_KEY)
+    except ValueError:
+        # Not set yet (or evicted): every key built from the old value is abandoned either way
+        cache.set(_PROFILE_VERSION_KEY, _initial_version(), None)
+        return
+    cache.set(_changes_cache_key(version), sorted(profile_ids), PROFILE_CHANGES_SECONDS)
+
+
+def changed_profiles(since, until):
+    """
+    Ids of the profiles changed by the bumps that took the version from ``since`` to
+    ``until``, or None if they are not all known (too many, expired, or the version restarted)
+    """
+    if not since < until <= since + MAX_TRACKED_CHANGES:
+        return None
+    keys = [_changes_cache_key(version) for version in range(since + 1, until + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) != len(keys):
+        return None
+    return set().union(*changes.values())
+
+
+def _matches_cache_key(recruiter_id):
+    return f'candidate_matches:{recruiter_id}:{profile_version()}'
+
+
+def invalidate_recruiter(recruiter_id):
+    cache.delete(_matches_cache_key(recruiter_id))
+
+
+def compute_matches(recruiter_id, limit=MATCHES_PER_JOB):
+    """{job id: [(profile id, overlap), ...]} best first, for each of the recruiter's jobs with a match"""
+    from .models import Profile, Skill
+
+    # Intern the recruiter's job skills to columns
+    columns = {}
+    job_rows = {}
+    job_cells = []
+    for job_id, name in JobSkill.objects.filter(job__posted_by_id=recruiter_id).values_list('job_id', 'name'):
+        job_cells.append((job_rows.setdefault(job_id, len(job_rows)), columns.setdefault(name, len(columns))))
+    if not job_cells:
+        return {}
+
+    # Skill rows whose normalized name is one of those columns
+    skill_columns = {
+        skill_id: columns[name]
+        for skill_id, name in Skill.objects.filter(name_normalized__in=columns).values_list('id', 'name_normalized')
+    }
+    profile_skills = np.array(
+        list(Profile.skills.through.objects.filter(
+            skill_id__in=list(skill_columns),
+            profile__privacy_level=Profile.PRIVACY_PUBLIC,
+            profile__user__role='seeker',
+        ).values_list('profile_id', 'skill_id')),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    if not len(profile_skills):
+        return {}
+
+    profile_ids, profile_rows = np.unique(profile_skills[:, 0], return_inverse=True)
+    skill_column = np.vectorize(skill_columns.__getitem__, otypes=[np.int64])(profile_skills[:, 1])
+    profiles = np.zeros((len(profile_ids), len(columns)), dtype=np.float32)
+    # Two Skill rows can share a normalized name; a profile counts it once
+    profiles[profile_rows, skill_column] = 1
+    jobs = np.zeros((len(job_rows), len(columns)), dtype=np.float32)
+    rows, cols = zip(*job_cells)
+    jobs[list(rows), list(cols)] = 1
+
+    overlaps = (profiles @ jobs.T).astype(np.int64)
+
+    matches = {}
+    for job_id, row in job_rows.items():
+        overlap = overlaps[:, row]
+        candidates = np.flatnonzero(overlap >= MIN_OVERLAP)
+        if not len(candidates):
+            continue
+        # Highest overlap first, then oldest profile
+        best = candidates[np.lexsort((profile_ids[candidates], -overlap[candidates]))][:limit]
+        matches[job_id] = [(int(profile_ids[i]), int(overlap[i])) for i in best]
+    return matches
+
+
+def recommended_candidates(recruiter):
+    """compute_matches for ``recruiter``, cached until their jobs or any profile changes"""
+    key = _matches_cache_key(recruiter.id)
+    matches = cache.get(key)
+    if matches is None:
+        matches = compute_matches(recruiter.id)
+        cache.set(key, matches, MATCHES_CACHE_SECONDS)
+    return matches
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_profile_latitude_profile_longitude'),
+        ('jobs', '0011_job_lat_lng_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicantClusterSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.JSONField(default=dict, help_text='Applicants and clusterer state, see accounts.clusters')),
+                ('etag', models.CharField(max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='applicant_cluster_snapshots', to='jobs.job')),
+                ('recruiter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applicant_cluster_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('recruiter', 'job'), name='unique_cluster_snapshot_per_job'), models.UniqueConstraint(condition=models.Q(('job__isnull', True)), fields=('recruiter',), name='unique_cluster_snapshot_per_recruiter')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:02
+
+import accounts.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_profile_picture_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, storage=accounts.storage.ContentAddressedStorage(), upload_to='profiles/'),
+        ),
+    ]
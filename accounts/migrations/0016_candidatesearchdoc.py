@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def backfill_search_docs(apps, schema_editor):
+    # Same content as accounts.search_docs builds, from the historical models
+    Profile = apps.get_model('accounts', 'Profile')
+    CandidateSearchDoc = apps.get_model('accounts', 'CandidateSearchDoc')
+    rows = []
+    for profile in Profile.objects.select_related('user').prefetch_related('skills', 'projects').iterator(chunk_size=500):
+        rows.append(CandidateSearchDoc(
+            profile=profile,
+            role=profile.user.role,
+            privacy_level=profile.privacy_level,
+            location=_normalize(profile.location)[:120],
+            skill_ids=sorted(skill.id for skill in profile.skills.all()),
+            project_text='\n'.join(
+                _normalize(f'{project.title} {project.description}') for project in profile.projects.all()
+            ),
+        ))
+    CandidateSearchDoc.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_profile_picture_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateSearchDoc',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_doc', serialize=False, to='accounts.profile')),
+                ('role', models.CharField(choices=[('recruiter', 'Recruiter'), ('seeker', 'Job Seeker')], max_length=20)),
+                ('privacy_level', models.CharField(choices=[('public', 'Public (anyone can view)'), ('private', 'Private (only me)')], max_length=20)),
+                ('location', models.CharField(blank=True, help_text='Lowercased, whitespace collapsed', max_length=120)),
+                ('skill_ids', models.JSONField(default=list)),
+                ('project_text', models.TextField(blank=True, help_text="Lowercased titles and descriptions of the profile's projects")),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['role', 'privacy_level'], name='accounts_search_doc_role_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_search_docs, migrations.RunPython.noop),
+    ]
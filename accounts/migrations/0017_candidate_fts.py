@@ -0,0 +1,109 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:11
+
+from django.db import migrations, models
+
+# FTS5 index over the text of the candidate search documents, used by
+# accounts.search.SQLiteFTSCandidateSearch. Like jobs_job_fts it is an
+# external-content table kept in step by triggers on its source table.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE accounts_candidate_fts USING fts5(
+        headline, bio, project_text, work_text,
+        content='accounts_candidatesearchdoc', content_rowid='profile_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER accounts_candidate_fts_ai AFTER INSERT ON accounts_candidatesearchdoc BEGIN
+        INSERT INTO accounts_candidate_fts(rowid, headline, bio, project_text, work_text)
+        VALUES (new.profile_id, new.headline, new.bio, new.project_text, new.work_text);
+    END
+    """,
+    """
+    CREATE TRIGGER accounts_candidate_fts_ad AFTER DELETE ON accounts_candidatesearchdoc BEGIN
+        INSERT INTO accounts_candidate_fts(accounts_candidate_fts, rowid, headline, bio, project_text, work_text)
+        VALUES ('delete', old.profile_id, old.headline, old.bio, old.project_text, old.work_text);
+    END
+    """,
+    """
+    CREATE TRIGGER accounts_candidate_fts_au AFTER UPDATE OF headline, bio, project_text, work_text
+    ON accounts_candidatesearchdoc BEGIN
+        INSERT INTO accounts_candidate_fts(accounts_candidate_fts, rowid, headline, bio, project_text, work_text)
+        VALUES ('delete', old.profile_id, old.headline, old.bio, old.project_text, old.work_text);
+        INSERT INTO accounts_candidate_fts(rowid, headline, bio, project_text, work_text)
+        VALUES (new.profile_id, new.headline, new.bio, new.project_text, new.work_text);
+    END
+    """,
+    "INSERT INTO accounts_candidate_fts(accounts_candidate_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS accounts_candidate_fts_au",
+    "DROP TRIGGER IF EXISTS accounts_candidate_fts_ad",
+    "DROP TRIGGER IF EXISTS accounts_candidate_fts_ai",
+    "DROP TABLE IF EXISTS accounts_candidate_fts",
+]
+
+
+def backfill_text(apps, schema_editor):
+    Profile = apps.get_model('accounts', 'Profile')
+    CandidateSearchDoc = apps.get_model('accounts', 'CandidateSearchDoc')
+    docs = []
+    for profile in Profile.objects.filter(search_doc__isnull=False).prefetch_related('work_experience').iterator(chunk_size=500):
+        docs.append(CandidateSearchDoc(
+            profile_id=profile.pk,
+            headline=profile.headline,
+            bio=profile.bio,
+            work_text='\n'.join(f'{work.company} {work.description}' for work in profile.work_experience.all()),
+        ))
+    CandidateSearchDoc.objects.bulk_update(docs, ['headline', 'bio', 'work_text'], batch_size=500)
+
+
+def fts5_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_candidate_fts(apps, schema_editor):
+    # Other databases keep using the ORM search backend
+    if not fts5_supported(schema_editor.connection):
+        return
+    for sql in CREATE_FTS:
+        schema_editor.execute(sql)
+
+
+def drop_candidate_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_FTS:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_candidatesearchdoc'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatesearchdoc',
+            name='bio',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='candidatesearchdoc',
+            name='headline',
+            field=models.CharField(blank=True, max_length=140),
+        ),
+        migrations.AddField(
+            model_name='candidatesearchdoc',
+            name='work_text',
+            field=models.TextField(blank=True, help_text="Companies and descriptions of the profile's work experience"),
+        ),
+        migrations.RunPython(backfill_text, migrations.RunPython.noop),
+        migrations.RunPython(create_candidate_fts, drop_candidate_fts),
+    ]
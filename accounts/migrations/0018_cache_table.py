@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# Table of the "default" database cache in settings.CACHES, as
+# ``manage.py createcachetable`` would create it. Written out here so that it
+# shows in sqlmigrate, is dropped on reverse and does not depend on the
+# settings the migration happens to run under; keep LOCATION in step with it.
+CREATE_CACHE_TABLE = [
+    """
+    CREATE TABLE IF NOT EXISTS "jobfinder_cache" (
+        "cache_key" varchar(255) NOT NULL PRIMARY KEY,
+        "value" text NOT NULL,
+        "expires" datetime NOT NULL
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS "jobfinder_cache_expires" ON "jobfinder_cache" ("expires")',
+]
+
+DROP_CACHE_TABLE = [
+    'DROP INDEX IF EXISTS "jobfinder_cache_expires"',
+    'DROP TABLE IF EXISTS "jobfinder_cache"',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0017_candidate_fts'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_CACHE_TABLE, DROP_CACHE_TABLE),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:47
+
+from django.db import migrations, models
+
+
+def backfill_name_normalized(apps, schema_editor):
+    # Same as jobs.models.normalize_skill
+    Skill = apps.get_model('accounts', 'Skill')
+    skills = list(Skill.objects.all())
+    for skill in skills:
+        skill.name_normalized = skill.name.strip().lower()[:200]
+    Skill.objects.bulk_update(skills, ['name_normalized'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0018_cache_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='name_normalized',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_name_normalized, migrations.RunPython.noop),
+    ]
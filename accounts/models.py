@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from .storage import profile_picture_storage
+
 
 class CustomUser(AbstractUser):
     ROLE_CHOICES = (
@@ -11,8 +13,18 @@ class CustomUser(AbstractUser):
 
 class Skill(models.Model):
     name = models.CharField(max_length=64, unique=True)
+    # jobs.models.normalize_skill(name): the form job skills are stored in, for indexed matching
+    name_normalized = models.CharField(max_length=64, db_index=True, editable=False, default='')
     def __str__(self): return self.name
 
+    def save(self, *args, **kwargs):
+        from jobs.models import normalize_skill
+        self.name_normalized = normalize_skill(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'name_normalized'}
+        super().save(*args, **kwargs)
+
 class Project(models.Model):
     title = models.CharField(max_length=120)
     url = models.URLField(blank=True)
@@ -44,7 +56,9 @@ class Profile(models.Model):
     website = models.URLField(blank=True)
     github = models.URLField(blank=True)
     linkedin = models.URLField(blank=True)
-    profile_picture = models.ImageField(upload_to="profiles/", blank=True, null=True)
+    profile_picture = models.ImageField(upload_to="profiles/", storage=profile_picture_storage, blank=True, null=True)
+    # Content hash naming the resized copies of profile_picture (see accounts.thumbnails)
+    profile_picture_hash = models.CharField(max_length=64, blank=True, editable=False)
     
     # Commute radius preference in kilometers
     commute_radius = models.PositiveIntegerField(
@@ -101,6 +115,11 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Message history pages and the unread-only is_read update
+            models.Index(fields=['conversation', 'created_at'], name='accounts_msg_conv_created_idx'),
+            models.Index(fields=['conversation', 'is_read', 'sender'], name='accounts_msg_conv_unread_idx'),
+        ]
     
     def __str__(self):
         return f"{self.sender.username}: {self.content[:50]}..."
@@ -136,3 +155,46 @@ class SearchMatchNotification(models.Model):
     
     def __str__(self):
         return f"Notification: {self.saved_search.name} → {self.candidate.username}"
+
+class ApplicantClusterSnapshot(models.Model):
+    """Saved applicant clusters of one recruiter, across all their jobs (job is null) or for one job"""
+    recruiter = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='applicant_cluster_snapshots')
+    job = models.ForeignKey('jobs.Job', on_delete=models.CASCADE, null=True, blank=True, related_name='applicant_cluster_snapshots')
+    state = models.JSONField(default=dict, help_text="Applicants and clusterer state, see accounts.clusters")
+    etag = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['recruiter', 'job'], name='unique_cluster_snapshot_per_job'),
+            models.UniqueConstraint(
+                fields=['recruiter'], condition=models.Q(job__isnull=True),
+                name='unique_cluster_snapshot_per_recruiter',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Applicant clusters: {self.recruiter.username}" + (f" / job {self.job_id}" if self.job_id else "")
+
+class CandidateSearchDoc(models.Model):
+    """Flattened copy of the searchable parts of one profile, maintained by accounts.search_docs"""
+    profile = models.OneToOneField(Profile, on_delete=models.CASCADE, primary_key=True, related_name='search_doc')
+    role = models.CharField(max_length=20, choices=CustomUser.ROLE_CHOICES)
+    privacy_level = models.CharField(max_length=20, choices=Profile.PRIVACY_CHOICES)
+    location = models.CharField(max_length=120, blank=True, help_text="Lowercased, whitespace collapsed")
+    skill_ids = models.JSONField(default=list)
+    project_text = models.TextField(blank=True, help_text="Lowercased titles and descriptions of the profile's projects")
+    headline = models.CharField(max_length=140, blank=True)
+    bio = models.TextField(blank=True)
+    work_text = models.TextField(blank=True, help_text="Companies and descriptions of the profile's work experience")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # accounts_candidate_fts (migration 0017) mirrors this table through triggers; an
+        # AlterField here would rebuild the table on SQLite and drop them
+        indexes = [
+            models.Index(fields=['role', 'privacy_level'], name='accounts_search_doc_role_idx'),
+        ]
+
+    def __str__(self):
+        return f"Search document: profile {self.profile_id}"
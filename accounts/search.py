@@ -0,0 +1,123 @@
+"""
+Keyword search over candidates: profile headline and bio, project titles and
+descriptions, and work experience companies and descriptions.
+
+The text lives on CandidateSearchDoc (kept current by accounts.search_docs
+as profiles are saved). ``get_candidate_search_backend()`` returns a backend
+whose ``search(queryset, text)`` filters a Profile queryset and annotates it
+with ``text_score``, higher for better matches; ``scores(queryset, text)``
+returns the (profile id, text_score) pairs of the matches for ranking in
+Python. The default backend uses the
+SQLite FTS5 table created in migration 0017 and ranks by BM25; where that
+table is not available it falls back to ORM ``icontains`` filters with a
+flat score.
+
+Set ``CANDIDATE_SEARCH_BACKEND`` in settings to a dotted path to swap backends.
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from jobs.search import search_terms
+
+FTS_TABLE = "accounts_candidate_fts"
+
+# Columns of the FTS table, in order; these match the CandidateSearchDoc fields they mirror
+SEARCH_FIELDS = ("headline", "bio", "project_text", "work_text")
+
+# bm25() column weights, same order as SEARCH_FIELDS
+FIELD_WEIGHTS = (5.0, 1.0, 3.0, 2.0)
+
+# Relevance of a candidate matching both skills and keywords is
+# SKILL_MATCH_WEIGHT * matched skills + text_score; a BM25 score rarely
+# exceeds this, so an extra matched skill usually outranks better wording
+SKILL_MATCH_WEIGHT = 5.0
+
+
+class ORMCandidateSearch:
+    """Portable backend: every term must appear (case-insensitively) in one of the fields"""
+
+    def search(self, queryset, text):
+        for term in search_terms(text):
+            term_q = Q()
+            for field in SEARCH_FIELDS:
+                term_q |= Q(**{f"search_doc__{field}__icontains": term})
+            queryset = queryset.filter(term_q)
+        return queryset.annotate(text_score=Value(1.0, output_field=FloatField()))
+
+    def scores(self, queryset, text):
+        return list(self.search(queryset, text).values_list("id", "text_score"))
+
+
+class SQLiteFTSCandidateSearch(ORMCandidateSearch):
+    """BM25-ranked prefix search on the FTS5 index of the candidate search documents"""
+
+    _available = None
+
+    def is_available(self):
+        if SQLiteFTSCandidateSearch._available is None:
+            SQLiteFTSCandidateSearch._available = (
+                connection.vendor == "sqlite"
+                and FTS_TABLE in connection.introspection.table_names()
+            )
+        return SQLiteFTSCandidateSearch._available
+
+    def match_expression(self, text):
+        # Quoted prefix terms, as in jobs.search: FTS operators typed by users stay text
+        return " ".join(f'"{term}"*' for term in search_terms(text))
+
+    def search(self, queryset, text):
+        if not self.is_available():
+            return super().search(queryset, text)
+
+        match = self.match_expression(text)
+        if not match:
+            return queryset.annotate(text_score=Value(0.0, output_field=FloatField()))
+
+        weights = ", ".join(str(w) for w in FIELD_WEIGHTS)
+        # bm25() is lower for better matches; negate it so scores add up with skill matches
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            text_score=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = accounts_profile.id",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+
+    def scores(self, queryset, text):
+        if not self.is_available():
+            return super().scores(queryset, text)
+
+        match = self.match_expression(text)
+        if not match:
+            return [(profile_id, 0.0) for profile_id in queryset.values_list("id", flat=True)]
+
+        # One pass over the index for every score, rather than a bm25() lookup per profile
+        weights = ", ".join(str(w) for w in FIELD_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                [match],
+            )
+            text_scores = dict(cursor.fetchall())
+        profile_ids = queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).values_list("id", flat=True)
+        return [(profile_id, text_scores[profile_id]) for profile_id in profile_ids]
+
+
+_backend = None
+
+
+def get_candidate_search_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "CANDIDATE_SEARCH_BACKEND", "accounts.search.SQLiteFTSCandidateSearch")
+        _backend = import_string(path)()
+    return _backend
@@ -0,0 +1,96 @@
+"""
+Maintenance of the CandidateSearchDoc table.
+
+Candidate searches used to filter Profile through joins on the user (role),
+skills and projects, then undo the join fan-out with DISTINCT. Each profile
+now has one CandidateSearchDoc row carrying what those filters look at, so
+a search is a one-to-one join with no fan-out. Its text columns are also
+indexed for full-text search (accounts.search).
+
+Signals (accounts.signals) call ``schedule_refresh`` whenever a profile, its
+user, skills, projects or work experience change. Refreshes are collected
+and run once the surrounding transaction commits, so saving a profile
+together with its skills and projects rewrites its row once. ``rebuild_all`` (the
+``rebuild_candidate_search_docs`` command) recomputes the whole table.
+"""
+import threading
+
+from django.db import transaction
+
+from . import matching
+
+_pending = threading.local()
+
+
+def normalize_text(text):
+    """Lowercase and collapse whitespace, as stored in the document fields"""
+    return ' '.join((text or '').lower().split())
+
+
+def _build(profile):
+    from .models import CandidateSearchDoc
+    return CandidateSearchDoc(
+        profile=profile,
+        role=profile.user.role,
+        privacy_level=profile.privacy_level,
+        location=normalize_text(profile.location)[:120],
+        skill_ids=sorted(skill.id for skill in profile.skills.all()),
+        project_text='\n'.join(
+            normalize_text(f'{project.title} {project.description}') for project in profile.projects.all()
+        ),
+        headline=profile.headline,
+        bio=profile.bio,
+        work_text='\n'.join(f'{work.company} {work.description}' for work in profile.work_experience.all()),
+    )
+
+
+def refresh(profile_ids):
+    """Rewrite the documents of the given profiles; returns the number written"""
+    from .models import CandidateSearchDoc, Profile
+    profiles = list(
+        Profile.objects.filter(pk__in=profile_ids)
+        .select_related('user')
+        .prefetch_related('skills', 'projects', 'work_experience')
+    )
+    CandidateSearchDoc.objects.bulk_create(
+        [_build(profile) for profile in profiles],
+        update_conflicts=True,
+        unique_fields=['profile'],
+        update_fields=[
+            'role', 'privacy_level', 'location', 'skill_ids', 'project_text', 'headline', 'bio', 'work_text',
+            'updated_at',
+        ],
+    )
+    # Only now, once the changes are committed, may caches built from them be recomputed
+    matching.bump_profile_version(profile_ids)
+    return len(profiles)
+
+
+def _flush():
+    profile_ids = getattr(_pending, 'profile_ids', None)
+    if profile_ids:
+        _pending.profile_ids = set()
+        refresh(profile_ids)
+
+
+def schedule_refresh(profile_ids):
+    """Refresh these profiles' documents once the current transaction commits"""
+    profile_ids = set(profile_ids)
+    if not profile_ids:
+        return
+    if not hasattr(_pending, 'profile_ids'):
+        _pending.profile_ids = set()
+    _pending.profile_ids |= profile_ids
+    # Every call registers a flush since a rolled back transaction drops its callbacks;
+    # the first flush to run takes all pending ids and the rest find nothing to do
+    transaction.on_commit(_flush)
+
+
+def rebuild_all(batch_size=500):
+    """Recompute every document; returns the number written"""
+    from .models import Profile
+    profile_ids = list(Profile.objects.order_by('pk').values_list('pk', flat=True))
+    with transaction.atomic():
+        for start in range(0, len(profile_ids), batch_size):
+            refresh(profile_ids[start:start + batch_size])
+    return len(profile_ids)
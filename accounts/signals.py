@@ -0,0 +1,130 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models.signals import pre_save, pre_delete, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from jobs.models import Application, Job
+from . import clusters, matching, search_docs, thumbnails
+from .context_processors import invalidate_unread_count
+from .models import CustomUser, Message, Profile, Project, Skill, WorkExperience
+from .skill_index import skill_index
+
+
+def _stored_coordinates(latitude, longitude):
+    """Coordinates as the database stores them: Decimals at the fields' precision, or None"""
+    coordinates = []
+    for name, value in (('latitude', latitude), ('longitude', longitude)):
+        field = Profile._meta.get_field(name)
+        try:
+            value = field.to_python(value)
+        except ValidationError:
+            pass
+        else:
+            if value is not None:
+                value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+        coordinates.append(value)
+    return tuple(coordinates)
+
+
+@receiver(pre_save, sender=Profile)
+def remember_saved_profile(sender, instance, **kwargs):
+    saved = (
+        Profile.objects.filter(pk=instance.pk).values_list('latitude', 'longitude', 'profile_picture').first()
+        if instance.pk else None
+    )
+    instance._saved_coordinates = _stored_coordinates(*saved[:2]) if saved else None
+    instance._saved_picture = saved[2] if saved else None
+
+
+@receiver(post_save, sender=Profile)
+def update_applicant_clusters(sender, instance, **kwargs):
+    # The instance may hold floats or strings, the stored values are Decimals
+    coordinates = _stored_coordinates(instance.latitude, instance.longitude)
+    if getattr(instance, '_saved_coordinates', None) != coordinates:
+        clusters.applicant_moved(instance.user_id)
+
+
+@receiver(post_save, sender=Profile)
+def render_profile_picture(sender, instance, **kwargs):
+    if (instance.profile_picture.name or None) != (getattr(instance, '_saved_picture', None) or None):
+        thumbnails.generate_renditions(instance)
+
+
+@receiver(post_delete, sender=Profile)
+def remove_applicant_from_clusters(sender, instance, **kwargs):
+    clusters.applicant_moved(instance.user_id)
+
+
+@receiver(post_save, sender=Application)
+def add_application_to_cluster_snapshots(sender, instance, created, **kwargs):
+    if created:
+        clusters.application_created(instance)
+
+
+@receiver(post_delete, sender=Application)
+def drop_cluster_snapshots_of_application(sender, instance, **kwargs):
+    clusters.application_deleted(instance)
+
+
+@receiver(post_save, sender=Message)
+def invalidate_recipient_unread_count(sender, instance, created, **kwargs):
+    if created:
+        conversation = instance.conversation
+        invalidate_unread_count(
+            *{conversation.recruiter_id, conversation.candidate_id} - {instance.sender_id}
+        )
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def invalidate_skill_index(sender, instance, **kwargs):
+    skill_index.invalidate()
+    matching.bump_profile_version()
+
+
+@receiver(post_delete, sender=Profile)
+def invalidate_candidate_caches(sender, instance, **kwargs):
+    # Edits bump the version when their search document is refreshed (accounts.search_docs)
+    matching.bump_profile_version([instance.pk])
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_recruiter_matches(sender, instance, **kwargs):
+    matching.invalidate_recruiter(instance.posted_by_id)
+
+
+@receiver(post_save, sender=Profile)
+def refresh_profile_search_doc(sender, instance, **kwargs):
+    search_docs.schedule_refresh([instance.pk])
+
+
+@receiver(post_save, sender=CustomUser)
+def refresh_user_search_doc(sender, instance, created, update_fields=None, **kwargs):
+    # Logins only save last_login
+    if created or (update_fields is not None and 'role' not in update_fields):
+        return
+    search_docs.schedule_refresh(Profile.objects.filter(user=instance).values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=Profile.skills.through)
+@receiver(m2m_changed, sender=Profile.projects.through)
+@receiver(m2m_changed, sender=Profile.work_experience.through)
+def refresh_search_docs_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        search_docs.schedule_refresh([instance.pk])
+    elif pk_set:
+        # Edited from the other side: pk_set holds profiles
+        search_docs.schedule_refresh(pk_set)
+
+
+@receiver(post_save, sender=Project)
+@receiver(pre_delete, sender=Project)
+@receiver(post_save, sender=WorkExperience)
+@receiver(pre_delete, sender=WorkExperience)
+@receiver(pre_delete, sender=Skill)
+def refresh_search_docs_of_related_profiles(sender, instance, **kwargs):
+    search_docs.schedule_refresh(instance.profile_set.values_list('pk', flat=True))
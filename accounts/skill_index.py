@@ -0,0 +1,77 @@
+"""
+In-memory prefix index over the Skill vocabulary, for the skill autocomplete.
+
+Skill names are kept lowercased in one sorted list, so the names starting
+with a prefix are a contiguous slice found by two bisections. Matches are
+ranked by popularity (how many profiles list the skill). The index is
+loaded lazily, dropped when a Skill is created here, and reloaded after
+SKILL_INDEX_TTL seconds to pick up skills created by other processes and
+changes in popularity.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.models import Count
+
+
+class SkillIndex:
+    def __init__(self, ttl=None):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        # Parallel lists sorted by lowercased name
+        self._keys = None
+        self._entries = None
+
+    def _ttl_seconds(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, 'SKILL_INDEX_TTL', 300)
+
+    def _ensure_loaded(self):
+        # Caller holds the lock
+        if self._keys is not None and time.monotonic() - self._loaded_at < self._ttl_seconds():
+            return
+        from .models import Skill
+        rows = sorted(
+            (name.lower(), skill_id, name, popularity)
+            for skill_id, name, popularity in Skill.objects.annotate(
+                popularity=Count('profile')
+            ).values_list('id', 'name', 'popularity').iterator()
+        )
+        self._keys = [row[0] for row in rows]
+        self._entries = [row[1:] for row in rows]
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._keys = None
+            self._entries = None
+
+    def complete(self, prefix, limit=10):
+        """The ``limit`` most popular skills whose name starts with ``prefix`` (case-insensitive)"""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        with self._lock:
+            self._ensure_loaded()
+            start = bisect_left(self._keys, prefix)
+            # Every key starting with the prefix sorts before prefix + the highest code point
+            end = bisect_left(self._keys, prefix + '\U0010ffff', lo=start)
+            matches = self._entries[start:end]
+        ranked = heapq.nsmallest(limit, matches, key=lambda entry: (-entry[2], entry[1].lower()))
+        return [
+            {'id': skill_id, 'name': name, 'count': popularity}
+            for skill_id, name, popularity in ranked
+        ]
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._keys)
+
+
+skill_index = SkillIndex()
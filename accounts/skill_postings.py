@@ -0,0 +1,171 @@
+"""
+In-memory inverted index from skill to the public seeker profiles listing
+it, for the skill filters of the candidate search (saved searches match
+skills with SQL subqueries instead). It is loaded from the skill lists of
+CandidateSearchDoc rows.
+
+Each skill's posting list is a sorted NumPy array of profile ids, so
+"match all" is an intersection of the selected skills' lists (shortest
+first) and "match any" with a matched-skill count is one concatenation and
+np.unique, with no join on the profile-skill table per selected skill.
+The index also holds each profile's username, so the candidate search can
+order and page a skill match (accounts.views) without a query per page
+beyond loading the profiles shown. It is loaded lazily. When the candidate
+profile version (accounts.matching) moves on, only the documents of the
+profiles changed since are read again and patched into the lists; the
+whole index is reloaded after SKILL_POSTINGS_TTL seconds, or when those
+changes are no longer known.
+"""
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+import numpy as np
+from django.conf import settings
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+class SkillMatch(namedtuple('SkillMatch', 'profile_ids matched usernames username_ranks')):
+    """
+    Profiles matched by a skill filter, as parallel arrays sorted by profile id: how many of
+    the selected skills each lists, its username, and the position of that username in
+    username order (for sorting)
+    """
+
+    def take(self, rows):
+        """The matches at ``rows`` (indices or a boolean mask)"""
+        return SkillMatch._make(column[rows] for column in self)
+
+
+class SkillPostings:
+    def __init__(self, ttl=None):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._version = None
+        self._postings = None
+        self._profile_skills = {}
+        self._profile_ids = _EMPTY
+        self._usernames = np.empty(0, dtype=object)
+        self._username_ranks = _EMPTY
+
+    def _ttl_seconds(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, 'SKILL_POSTINGS_TTL', 300)
+
+    def _ensure_loaded(self):
+        # Caller holds the lock
+        from .matching import changed_profiles, profile_version
+        version = profile_version()
+        if self._postings is None or time.monotonic() - self._loaded_at >= self._ttl_seconds():
+            self._load(version)
+        elif version != self._version:
+            profile_ids = changed_profiles(self._version, version)
+            if profile_ids is None:
+                self._load(version)
+            else:
+                self._update(profile_ids, version)
+
+    @staticmethod
+    def _docs(**filters):
+        from .models import CandidateSearchDoc, Profile
+        return CandidateSearchDoc.objects.filter(
+            role='seeker', privacy_level=Profile.PRIVACY_PUBLIC, **filters,
+        ).order_by('profile_id').values_list('profile_id', 'skill_ids', 'profile__user__username')
+
+    def _load(self, version):
+        profile_ids = []
+        usernames = []
+        pairs = []
+        self._profile_skills = {}
+        for profile_id, skill_ids, username in self._docs().iterator():
+            profile_ids.append(profile_id)
+            usernames.append(username)
+            self._profile_skills[profile_id] = skill_ids
+            pairs.extend((skill_id, profile_id) for skill_id in skill_ids)
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+        skill_ids, starts = np.unique(pairs[:, 0], return_index=True)
+        # Slices of one array, already sorted by profile id within each skill
+        self._postings = {
+            int(skill_id): posting
+            for skill_id, posting in zip(skill_ids, np.split(pairs[:, 1], starts[1:]))
+        }
+        self._set_profiles(np.array(profile_ids, dtype=np.int64), np.array(usernames, dtype=object))
+        self._version = version
+        self._loaded_at = time.monotonic()
+
+    def _update(self, changed_ids, version):
+        """Re-read the documents of ``changed_ids`` and patch them into the index"""
+        docs = list(self._docs(profile_id__in=changed_ids))
+        left = defaultdict(list)
+        joined = defaultdict(list)
+        for profile_id in changed_ids:
+            for skill_id in self._profile_skills.pop(profile_id, ()):
+                left[skill_id].append(profile_id)
+        for profile_id, skill_ids, username in docs:
+            self._profile_skills[profile_id] = skill_ids
+            for skill_id in skill_ids:
+                joined[skill_id].append(profile_id)
+        # New arrays rather than edits in place: match() uses the old ones outside the lock
+        for skill_id in left.keys() | joined.keys():
+            posting = self._postings.get(skill_id, _EMPTY)
+            if skill_id in left:
+                posting = np.setdiff1d(posting, left[skill_id], assume_unique=True)
+            if skill_id in joined:
+                posting = np.union1d(posting, np.array(joined[skill_id], dtype=np.int64))
+            if len(posting):
+                self._postings[skill_id] = posting
+            else:
+                self._postings.pop(skill_id, None)
+
+        stale = np.isin(self._profile_ids, np.fromiter(changed_ids, dtype=np.int64, count=len(changed_ids)))
+        current = {profile_id: username for profile_id, _, username in docs}
+        # Most changes only touch skills, leaving the profiles and their usernames as they were
+        if dict(zip(self._profile_ids[stale].tolist(), self._usernames[stale])) != current:
+            profile_ids = np.concatenate([
+                self._profile_ids[~stale], np.fromiter(current, dtype=np.int64, count=len(current)),
+            ])
+            usernames = np.concatenate([self._usernames[~stale], np.array(list(current.values()), dtype=object)])
+            order = np.argsort(profile_ids, kind='stable')
+            self._set_profiles(profile_ids[order], usernames[order])
+        self._version = version
+
+    def _set_profiles(self, profile_ids, usernames):
+        self._profile_ids = profile_ids
+        self._usernames = usernames
+        # Usernames are unique, so their ranks order profiles exactly as the usernames do
+        self._username_ranks = np.empty(len(usernames), dtype=np.int64)
+        self._username_ranks[np.argsort(usernames, kind='stable')] = np.arange(len(usernames))
+
+    def invalidate(self):
+        with self._lock:
+            self._postings = None
+
+    def match(self, skill_ids, match_all=False):
+        """SkillMatch of the profiles listing every one (``match_all``) or any of ``skill_ids``"""
+        with self._lock:
+            self._ensure_loaded()
+            lists = [self._postings.get(skill_id, _EMPTY) for skill_id in set(skill_ids)]
+            profile_ids, usernames, username_ranks = self._profile_ids, self._usernames, self._username_ranks
+
+        if not lists:
+            matched_ids, matched = _EMPTY, _EMPTY
+        elif match_all:
+            lists.sort(key=len)
+            matched_ids = lists[0]
+            for posting in lists[1:]:
+                if not len(matched_ids):
+                    break
+                matched_ids = np.intersect1d(matched_ids, posting, assume_unique=True)
+            matched = np.full(len(matched_ids), len(lists), dtype=np.int64)
+        else:
+            matched_ids, matched = np.unique(np.concatenate(lists), return_counts=True)
+        # Postings and profiles are loaded and updated together, so each id is found
+        rows = np.searchsorted(profile_ids, matched_ids)
+        return SkillMatch(matched_ids, matched, usernames[rows], username_ranks[rows])
+
+
+skill_postings = SkillPostings()
@@ -0,0 +1,78 @@
+"""
+Content-addressed storage for uploaded profile pictures.
+
+Files are stored under the upload directory by the SHA-256 of their
+content (``profiles/ab/ab12...ef.jpg``), whatever they were called when
+uploaded. Uploading the same image again, by the same user or another,
+writes nothing and points at the file already stored, so each image is on
+disk once and a stored name never changes content (safe to cache forever).
+
+Files are shared, so nothing is deleted when a profile changes its
+picture. ``reference_counts`` counts the profiles using each stored file
+and the ``sweep_profile_pictures`` command removes the ones no profile
+uses any more.
+"""
+import hashlib
+import os
+import posixpath
+import re
+from collections import Counter
+
+from django.core.files.storage import FileSystemStorage
+from django.db.models import Count
+from django.utils.deconstruct import deconstructible
+
+# Relative names written by ContentAddressedStorage
+BLOB_NAME_RE = re.compile(r'^(?P<directory>.+/)?[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})(?P<ext>\.[a-z0-9]+)?$')
+
+
+def file_digest(content):
+    sha256 = hashlib.sha256()
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files by their content and stores each content once"""
+
+    def content_name(self, name, digest):
+        directory = posixpath.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        return posixpath.join(directory, digest[:2], f'{digest}{ext}')
+
+    def _save(self, name, content):
+        blob_name = self.content_name(name, file_digest(content))
+        if self.exists(blob_name):
+            return blob_name
+        saved_name = super()._save(blob_name, content)
+        if saved_name != blob_name:
+            # Another upload of the same content won the race; the copies are identical
+            self.delete(saved_name)
+        return blob_name
+
+
+profile_picture_storage = ContentAddressedStorage()
+
+
+def reference_counts():
+    """{stored name: number of profiles using it}"""
+    from .models import Profile
+    return Counter(dict(
+        Profile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        .values('profile_picture')
+        .annotate(references=Count('pk'))
+        .values_list('profile_picture', 'references')
+    ))
+
+
+def stored_files(storage, directory):
+    """Relative names of every file under ``directory``, recursively"""
+    if not storage.exists(directory):
+        return
+    subdirectories, files = storage.listdir(directory)
+    for filename in files:
+        yield posixpath.join(directory, filename)
+    for subdirectory in subdirectories:
+        yield from stored_files(storage, posixpath.join(directory, subdirectory))
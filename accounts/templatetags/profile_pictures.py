@@ -0,0 +1,31 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from accounts import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def profile_picture(profile, size='small', alt='Profile picture', **attrs):
+    """
+    The profile's picture at a rendition size (see accounts.thumbnails.RENDITIONS):
+    WebP for browsers that take it, JPEG otherwise. Extra keyword arguments
+    (class, style, width...) go on the <img>. Pictures without renditions yet
+    fall back to the original upload.
+
+        {% profile_picture p 'small' class="rounded-circle" style="width: 60px;" %}
+    """
+    if not profile or not profile.profile_picture:
+        return ''
+    attrs = flatatt(attrs)
+    if not profile.profile_picture_hash:
+        return format_html('<img src="{}" alt="{}"{} />', profile.profile_picture.url, alt, attrs)
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" /><img src="{}" alt="{}"{} /></picture>',
+        thumbnails.rendition_url(profile, size, 'webp'),
+        thumbnails.rendition_url(profile, size, 'jpg'),
+        alt,
+        attrs,
+    )
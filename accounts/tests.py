@@ -1,3 +1,167 @@
-from django.test import TestCase
+import random
+import re
 
-# Create your tests here.
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobfinder.geo import KM_PER_DEGREE_LAT, GridClusterer
+from . import search_docs
+from .forms import ProjectFormSet
+from .management.commands.benchmark_applicant_clusters import _exhaustive_clusters, _grid_clusters
+from .models import CustomUser, Profile, Project, Skill
+from .views import CANDIDATE_PAGE_SIZE, _sync_profile_rows
+
+
+class CandidateSearchPagingTests(TestCase):
+    SEEKERS = 3000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.python, cls.django, cls.rust = [Skill.objects.create(name=name) for name in ('Python', 'Django', 'Rust')]
+        users = CustomUser.objects.bulk_create(
+            [CustomUser(username=f'seeker{i:05d}', role='seeker') for i in range(cls.SEEKERS)]
+        )
+        profiles = Profile.objects.bulk_create([
+            Profile(user=user, headline='python developer' if i % 2 else 'developer')
+            for i, user in enumerate(users)
+        ])
+        # Everyone lists Python, every third profile Django too; bulk_create sends no signals
+        Through = Profile.skills.through
+        Through.objects.bulk_create(
+            [Through(profile=profile, skill=cls.python) for profile in profiles]
+            + [Through(profile=profile, skill=cls.django) for profile in profiles[::3]]
+        )
+        search_docs.rebuild_all()
+        cls.recruiter = CustomUser.objects.create_user('recruiter', password='pw', role='recruiter')
+
+    def setUp(self):
+        self.client.force_login(self.recruiter)
+
+    def test_pages_past_first_page_of_large_or_search(self):
+        url = reverse('accounts.candidate_search')
+        params = {'skills': [self.python.id, self.django.id], 'project_keyword': 'python'}
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_count'], self.SEEKERS // 2)
+        names = [profile.user.username for profile in response.context['results']]
+        cursor = response.context['next_cursor']
+        self.assertIsNotNone(cursor)
+
+        with CaptureQueriesContext(connection) as queries:
+            while cursor:
+                data = self.client.get(url, {**params, 'cursor': cursor, 'format': 'json'}).json()
+                page = re.findall(r'class="text-decoration-none">\s*(\S+)\s*</a>', data['html'])
+                self.assertLessEqual(len(page), CANDIDATE_PAGE_SIZE)
+                names += page
+                cursor = data['next_cursor']
+
+        self.assertEqual(len(names), self.SEEKERS // 2)
+        self.assertEqual(len(set(names)), len(names))
+        # Profiles listing both skills rank first, then by username
+        both = {f'seeker{i:05d}' for i in range(0, self.SEEKERS, 3) if i % 2}
+        self.assertEqual(set(names[:len(both)]), both)
+        self.assertEqual(names[:len(both)], sorted(both))
+        self.assertEqual(names[len(both):], sorted(names[len(both):]))
+        # Only the ids of a page reach the database, never the whole result
+        self.assertLess(max(len(query['sql']) for query in queries.captured_queries), 2000)
+
+
+class GridClustererTests(SimpleTestCase):
+    RADIUS_KM = 80.47
+
+    def test_joins_centres_in_neighbouring_cells(self):
+        clusterer = GridClusterer(self.RADIUS_KM)
+        cell = clusterer.cell_deg
+        # Just either side of a cell boundary, well within the radius of each other
+        boundary = 40 * cell - 90.0
+        first = clusterer.add('a', boundary - 0.01, 10.0)
+        self.assertEqual(clusterer.add('b', boundary + 0.01, 10.0), first)
+        self.assertNotEqual(clusterer._cell(boundary - 0.01, 10.0), clusterer._cell(boundary + 0.01, 10.0))
+        # One radius away is in; a little further is not
+        edge = clusterer.clusters[first]['center_lat'] + self.RADIUS_KM / KM_PER_DEGREE_LAT
+        self.assertEqual(clusterer.add('c', edge - 1e-6, 10.0), first)
+        self.assertNotEqual(clusterer.add('d', edge + 0.5, 10.0), first)
+
+    def test_joins_across_the_antimeridian(self):
+        clusterer = GridClusterer(self.RADIUS_KM)
+        east = clusterer.add('east', -17.0, 179.9)
+        self.assertEqual(clusterer.add('west', -17.0, -179.9), east)
+        self.assertEqual(clusterer.clusters[east]['keys'], ['east', 'west'])
+
+    def test_matches_exhaustive_scan(self):
+        rng = random.Random(8)
+        cell = GridClusterer(self.RADIUS_KM).cell_deg
+        points = []
+        for i in range(600):
+            kind = i % 3
+            if kind == 0:
+                # Around the antimeridian
+                lat, lng = rng.uniform(-30, 30), rng.choice([-1, 1]) * rng.uniform(178.5, 180.0)
+            elif kind == 1:
+                # Close to cell boundaries
+                lat = rng.randrange(60, 120) * cell - 90.0 + rng.uniform(-0.05, 0.05)
+                lng = rng.randrange(200, 300) * cell - 180.0 + rng.uniform(-0.05, 0.05)
+            else:
+                # Near the poles, where longitude cells are narrow
+                lat, lng = rng.choice([-1, 1]) * rng.uniform(88.0, 90.0), rng.uniform(-180.0, 180.0)
+            points.append((i, lat, lng))
+        self.assertEqual(_grid_clusters(points, self.RADIUS_KM), _exhaustive_clusters(points, self.RADIUS_KM))
+
+
+class SyncProfileRowsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = Profile.objects.create(user=CustomUser.objects.create_user('seeker', role='seeker'))
+        other = Profile.objects.create(user=CustomUser.objects.create_user('other', role='seeker'))
+        cls.kept, cls.edited, cls.dropped, cls.shared = [
+            Project.objects.create(title=title) for title in ('Kept', 'Edited', 'Dropped', 'Shared')
+        ]
+        cls.profile.projects.add(cls.kept, cls.edited, cls.dropped, cls.shared)
+        other.projects.add(cls.shared)
+
+    def submit(self, rows):
+        data = {
+            'projects-TOTAL_FORMS': len(rows), 'projects-INITIAL_FORMS': 4,
+            'projects-MIN_NUM_FORMS': 0, 'projects-MAX_NUM_FORMS': 1000,
+        }
+        for i, row in enumerate(rows):
+            data.update({f'projects-{i}-{field}': value for field, value in row.items()})
+        formset = ProjectFormSet(data, queryset=self.profile.projects.order_by('pk'), prefix='projects')
+        self.assertTrue(formset.is_valid(), formset.errors)
+        _sync_profile_rows(self.profile, 'projects', formset)
+
+    def test_updates_in_place_creates_in_bulk_and_deletes(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.submit([
+                {'id': self.kept.pk, 'title': 'Kept'},
+                {'id': self.edited.pk, 'title': 'Renamed'},
+                {'id': self.dropped.pk, 'title': 'Dropped', 'DELETE': 'on'},
+                {'id': self.shared.pk, 'title': 'Shared', 'DELETE': 'on'},
+                {'title': 'New one'},
+                {'title': 'New two'},
+            ])
+
+        projects = {project.title: project.pk for project in self.profile.projects.all()}
+        # Existing rows keep their ids; only the edited one is written
+        self.assertEqual(projects.keys(), {'Kept', 'Renamed', 'New one', 'New two'})
+        self.assertEqual(projects['Kept'], self.kept.pk)
+        self.assertEqual(projects['Renamed'], self.edited.pk)
+        inserts = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "accounts_project"')]
+        self.assertEqual(len(inserts), 1)
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "accounts_project"')]
+        self.assertEqual(len(updates), 1)
+        # Removed rows are deleted, unless another profile still lists them
+        self.assertFalse(Project.objects.filter(pk=self.dropped.pk).exists())
+        self.assertTrue(Project.objects.filter(pk=self.shared.pk, profile__user__username='other').exists())
+
+    def test_unchanged_formset_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.submit([
+                {'id': project.pk, 'title': project.title}
+                for project in (self.kept, self.edited, self.dropped, self.shared)
+            ])
+        writes = [q['sql'] for q in queries.captured_queries if not q['sql'].startswith('SELECT')]
+        self.assertEqual(writes, [])
+        self.assertEqual(self.profile.projects.count(), 4)
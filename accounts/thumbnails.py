@@ -0,0 +1,100 @@
+"""
+Fixed-size renditions of profile pictures.
+
+Search results and conversation lists show pictures at 50-60px, so the
+original upload is far more than the page needs. Every uploaded picture is
+cropped to squares of RENDITIONS pixels, encoded as WebP and JPEG, and
+stored under ``profiles/renditions/`` named by a hash of the original's
+content. Profile.profile_picture_hash records that hash; the names of the
+renditions never change content, so they are served with a far-future
+Cache-Control (``views.profile_picture_rendition``) and a new upload simply
+gets new URLs.
+
+``render_renditions`` is pure (bytes in, bytes out) so the backfill command
+can run it in worker processes.
+"""
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+# Edge in pixels of each rendition: twice the size it is displayed at, for high-DPI screens
+RENDITIONS = {
+    'small': 120,
+    'medium': 240,
+}
+
+# File extension -> (Pillow format, content type, save options)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+RENDITION_DIR = 'profiles/renditions'
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:20]
+
+
+def rendition_name(digest, size, ext):
+    return f'{digest}-{size}.{ext}'
+
+
+def rendition_path(name):
+    return f'{RENDITION_DIR}/{name}'
+
+
+def render_renditions(data):
+    """Every rendition of the image in ``data``, as {name: bytes}; raises OSError on unreadable images"""
+    digest = content_hash(data)
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        renditions = {}
+        for size, edge in RENDITIONS.items():
+            resized = ImageOps.fit(image, (edge, edge), Image.Resampling.LANCZOS)
+            for ext, (image_format, _, options) in FORMATS.items():
+                buffer = io.BytesIO()
+                resized.save(buffer, image_format, **options)
+                renditions[rendition_name(digest, size, ext)] = buffer.getvalue()
+    return digest, renditions
+
+
+def save_renditions(renditions):
+    """Store rendered files; ones already stored (the same picture uploaded before) are kept"""
+    for name, data in renditions.items():
+        path = rendition_path(name)
+        if not default_storage.exists(path):
+            default_storage.save(path, ContentFile(data))
+
+
+def set_picture_hash(profile, digest):
+    from .models import Profile
+    profile.profile_picture_hash = digest
+    # A plain update: the rest of the profile is unchanged, so its save signals needn't run
+    Profile.objects.filter(pk=profile.pk).update(profile_picture_hash=digest)
+
+
+def generate_renditions(profile):
+    """Render and store the renditions of the profile's current picture; returns the hash or ''"""
+    digest = ''
+    if profile.profile_picture:
+        try:
+            with profile.profile_picture.open('rb') as picture:
+                digest, renditions = render_renditions(picture.read())
+            save_renditions(renditions)
+        except OSError:
+            # Missing or unreadable file: pages fall back to the original
+            digest = ''
+    set_picture_hash(profile, digest)
+    return digest
+
+
+def rendition_url(profile, size, ext):
+    return reverse(
+        'accounts.profile_picture_rendition',
+        args=[rendition_name(profile.profile_picture_hash, size, ext)],
+    )
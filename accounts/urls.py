@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 urlpatterns = [
     path('contact/<str:username>/', views.contact_candidate, name='accounts.contact_candidate'),
@@ -8,8 +8,10 @@ urlpatterns = [
 
     path('profile/me/', views.my_profile, name='accounts.my_profile'),
     path('profile/edit/', views.profile_edit, name='accounts.profile_edit'),
+    re_path(r'^profile-pictures/(?P<name>[0-9a-f]{20}-[a-z]+\.(?:webp|jpg))$', views.profile_picture_rendition, name='accounts.profile_picture_rendition'),
     path('profile/<str:username>/', views.profile_detail, name='accounts.profile_detail'),
     path('recruiter/search/', views.candidate_search, name='accounts.candidate_search'),
+    path('recruiter/search/without-profiles/', views.seekers_without_profiles, name='accounts.seekers_without_profiles'),
     path('profile/update-commute-radius', views.update_commute_radius, name='accounts.update_commute_radius'),
     
     # Saved search URLs
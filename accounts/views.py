@@ -2,21 +2,34 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login as auth_login, authenticate, logout as auth_logout, get_user_model
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from math import radians, sin, cos, asin, sqrt
-from decimal import InvalidOperation
 from .forms import CustomUserCreationForm, ProfileForm, CandidateSearchForm, ProjectFormSet, EducationFormSet, WorkExperienceFormSet, MessageForm, ContactCandidateForm, SaveSearchForm
-from .models import Profile, Education, WorkExperience, Conversation, Message, CustomUser, Project, SavedCandidateSearch, SearchMatchNotification
+from .models import Profile, Education, WorkExperience, Conversation, Message, CustomUser, Project, SavedCandidateSearch, SearchMatchNotification, Skill
 from .forms import CustomUserCreationForm, ProfileForm, CandidateSearchForm, ProjectFormSet, EducationFormSet, WorkExperienceFormSet, MessageForm
 from .models import Profile, Education, WorkExperience, Conversation, Message, CustomUser, Project
-from jobs.models import Job
-from django.db.models import Q, Count, Value
-from django.http import JsonResponse, HttpResponseForbidden
+from jobs.models import Job, normalize_skill
+from jobs.pagination import decode_cursor, encode_cursor, keyset_page
+from . import clusters, matching, search_docs, thumbnails
+from jobfinder import events
+from .context_processors import invalidate_unread_count
+from .skill_index import skill_index
+from .skill_postings import skill_postings
+from .search import SKILL_MATCH_WEIGHT, get_candidate_search_backend
+from django.db import transaction
+from django.db.models import Q, Count, Value, OuterRef, Subquery, IntegerField, F, FloatField, ExpressionWrapper
+from django.http import JsonResponse, HttpResponseForbidden, Http404, FileResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, require_safe
 from django.core.mail import EmailMessage, get_connection
+from django.core.files.storage import default_storage
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.formats import date_format
+from django.template.loader import render_to_string
+import hashlib
 import json
+import numpy as np
 
 
 @login_required
@@ -62,6 +75,61 @@ def login(request):
 
 User = get_user_model()
 
+def _get_or_create_skills(names):
+    """
+    Skills for ``names``, reusing existing ones regardless of case and creating the rest
+    with one bulk insert
+    """
+    wanted = {}
+    for name in names:
+        name = name[:Skill._meta.get_field('name').max_length]
+        if name:
+            wanted.setdefault(normalize_skill(name), name)
+    if not wanted:
+        return []
+    skills = list(Skill.objects.filter(name_normalized__in=wanted))
+    missing = set(wanted) - {skill.name_normalized for skill in skills}
+    if missing:
+        # bulk_create skips Skill.save(), which fills name_normalized
+        Skill.objects.bulk_create(
+            [Skill(name=wanted[key], name_normalized=key) for key in missing], ignore_conflicts=True
+        )
+        # bulk_create sends no post_save
+        skill_index.invalidate()
+        skills += Skill.objects.filter(name__in=[wanted[key] for key in missing])
+    return skills
+
+def _sync_profile_rows(profile, relation, formset):
+    """
+    Bring one of the profile's projects/education/work_experience relations in line with a
+    valid formset, touching only the rows that differ
+    """
+    manager = getattr(profile, relation)
+    model = manager.model
+    fields = formset.form._meta.fields
+    existing = set(manager.values_list('pk', flat=True))
+    kept, changed, added = set(), [], []
+    for f in formset:
+        if not f.cleaned_data or f.cleaned_data.get('DELETE', False):
+            continue
+        if f.instance.pk in existing:
+            kept.add(f.instance.pk)
+            if f.has_changed():
+                changed.append(f.instance)
+        else:
+            added.append(f.instance)
+    
+    if changed:
+        model.objects.bulk_update(changed, fields)
+    if added:
+        model.objects.bulk_create(added)
+        manager.add(*added)
+    removed = existing - kept
+    if removed:
+        manager.remove(*removed)
+        # Only rows no other profile still points to
+        model.objects.filter(pk__in=removed, profile__isnull=True).delete()
+
 @login_required
 def profile_edit(request):
     # US-1: create/edit own profile
@@ -81,9 +149,10 @@ def profile_edit(request):
    
     if request.method == "POST":
         form = ProfileForm(request.POST, request.FILES, instance=profile)
-        project_formset = ProjectFormSet(request.POST, prefix="projects")
-        education_formset = EducationFormSet(request.POST, prefix="education")
-        work_formset = WorkExperienceFormSet(request.POST, prefix="work")
+        # Bound to the profile's own rows so submitted ids can't point at anyone else's
+        project_formset = ProjectFormSet(request.POST, queryset=profile.projects.all(), prefix="projects")
+        education_formset = EducationFormSet(request.POST, queryset=profile.education.all(), prefix="education")
+        work_formset = WorkExperienceFormSet(request.POST, queryset=profile.work_experience.all(), prefix="work")
         
         # Check form validity and log errors if any
         form_valid = form.is_valid()
@@ -132,70 +201,40 @@ def profile_edit(request):
                     lng_value = None
         
         if form_valid and project_valid and education_valid and work_valid:
-            # Save form without committing first
-            profile = form.save(commit=False)
+            with transaction.atomic():
+                # Save form without committing first
+                profile = form.save(commit=False)
             
-            # Set latitude/longitude on the instance BEFORE saving
-            if lat_value is not None:
-                profile.latitude = lat_value
-            elif 'latitude' in request.POST and not request.POST['latitude'].strip():
-                # Explicitly clear if empty string was sent
-                profile.latitude = None
+                # Set latitude/longitude on the instance BEFORE saving
+                if lat_value is not None:
+                    profile.latitude = lat_value
+                elif 'latitude' in request.POST and not request.POST['latitude'].strip():
+                    # Explicitly clear if empty string was sent
+                    profile.latitude = None
                 
-            if lng_value is not None:
-                profile.longitude = lng_value
-            elif 'longitude' in request.POST and not request.POST['longitude'].strip():
-                # Explicitly clear if empty string was sent
-                profile.longitude = None
+                if lng_value is not None:
+                    profile.longitude = lng_value
+                elif 'longitude' in request.POST and not request.POST['longitude'].strip():
+                    # Explicitly clear if empty string was sent
+                    profile.longitude = None
             
-            # Save the instance (this saves all fields including coordinates)
-            profile.save()
+                # Save the instance (this saves all fields including coordinates)
+                profile.save()
             
-            # Save ManyToMany fields (skills)
-            form.save_m2m()
+                # Save ManyToMany fields (skills)
+                form.save_m2m()
             
-            # Add any new skills typed in
-            new_skills_csv = form.cleaned_data.get("new_skills") or ""
-            for skill_name in [s.strip() for s in new_skills_csv.split(',') if s.strip()]:
-                skill_obj, _ = Profile._meta.get_field('skills').remote_field.model.objects.get_or_create(name=skill_name)
-                profile.skills.add(skill_obj)
-
-            # Handle projects from formset - always create new instances to avoid sharing
-            profile.projects.clear()
-            for f in project_formset:
-                if f.cleaned_data and not f.cleaned_data.get('DELETE', False):
-                    # Always create a new project instance for this profile
-                    proj = Project.objects.create(
-                        title=f.cleaned_data.get('title', ''),
-                        url=f.cleaned_data.get('url', ''),
-                        description=f.cleaned_data.get('description', '')
-                    )
-                    profile.projects.add(proj)
-
-            # Handle education from formset - always create new instances to avoid sharing
-            profile.education.clear()
-            for f in education_formset:
-                if f.cleaned_data and not f.cleaned_data.get('DELETE', False):
-                    # Always create a new education instance for this profile
-                    edu = Education.objects.create(
-                        school=f.cleaned_data.get('school', ''),
-                        graduation_month=f.cleaned_data.get('graduation_month', 1),
-                        graduation_year=f.cleaned_data.get('graduation_year', 2024),
-                        major=f.cleaned_data.get('major', ''),
-                        degree=f.cleaned_data.get('degree', '')
-                    )
-                    profile.education.add(edu)
-
-            # Handle work experience from formset - always create new instances to avoid sharing
-            profile.work_experience.clear()
-            for f in work_formset:
-                if f.cleaned_data and not f.cleaned_data.get('DELETE', False):
-                    # Always create a new work experience instance for this profile
-                    work = WorkExperience.objects.create(
-                        company=f.cleaned_data.get('company', ''),
-                        description=f.cleaned_data.get('description', '')
-                    )
-                    profile.work_experience.add(work)
+                # Add any new skills typed in
+                new_skills_csv = form.cleaned_data.get("new_skills") or ""
+                new_skills = _get_or_create_skills(s.strip() for s in new_skills_csv.split(','))
+                if new_skills:
+                    profile.skills.add(*new_skills)
+
+                # Apply the formsets as a diff: unchanged rows are kept, edited ones updated,
+                # new ones bulk-inserted and removed ones deleted
+                _sync_profile_rows(profile, 'projects', project_formset)
+                _sync_profile_rows(profile, 'education', education_formset)
+                _sync_profile_rows(profile, 'work_experience', work_formset)
             
             messages.success(request, "Profile saved successfully!")
             # Refresh profile from database to ensure we have the latest data
@@ -278,6 +317,21 @@ def profile_detail(request, username):
 
     return render(request, "accounts/profile_detail.html", {"user_obj": user_obj, "profile": profile})
 
+@require_safe
+def profile_picture_rendition(request, name):
+    # Renditions are named by the hash of the original picture, so a URL's content never changes
+    etag = f'"{name}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        path = thumbnails.rendition_path(name)
+        if not default_storage.exists(path):
+            raise Http404("No such picture")
+        content_type = thumbnails.FORMATS[name.rsplit('.', 1)[1]][1]
+        response = FileResponse(default_storage.open(path, 'rb'), content_type=content_type)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 def edit_profile(request):
     profile, created = Profile.objects.get_or_create(user=request.user)
     if request.method == "POST":
@@ -294,130 +348,239 @@ def edit_profile(request):
         form = ProfileForm(instance=profile)
     return render(request, "accounts/profile_form.html", {"form": form})
 
+CANDIDATE_PAGE_SIZE = 20
+
+# How long a search's total count is reused; profile changes invalidate it sooner
+CANDIDATE_COUNT_CACHE_SECONDS = 600
+
+def _searchable_profiles():
+    """Public profiles of job seekers, selected through their CandidateSearchDoc"""
+    return Profile.objects.filter(
+        search_doc__role='seeker',
+        search_doc__privacy_level=Profile.PRIVACY_PUBLIC,
+    ).select_related("user").prefetch_related("skills", "projects")
+
+def _filter_text(qs, location, project_keyword):
+    """The location and keyword filters of a candidate search; keywords also annotate text_score"""
+    # Location is stored normalized on the one-to-one search document
+    if location:
+        qs = qs.filter(search_doc__location__contains=search_docs.normalize_text(location))
+    if project_keyword:
+        qs = get_candidate_search_backend().search(qs, project_keyword)
+    return qs
+
+def _filter_candidates(qs, location, project_keyword, skills, match_all_skills):
+    """
+    Apply the candidate search filters to a Profile queryset, ordered by relevance then username.
+    Skills are matched by subqueries on the profile-skill table, so the SQL does not grow with
+    the number of matching profiles. Keywords are matched and ranked by the candidate search
+    backend over headline, bio, projects and work.
+    candidate_search ranks searches with skills in memory instead (_rank_skill_matches).
+    """
+    qs = _filter_text(qs, location, project_keyword)
+
+    skill_ids = {s.id for s in skills}
+    if skill_ids:
+        profile_skills = Profile.skills.through.objects.filter(skill_id__in=skill_ids)
+        if match_all_skills:
+            # AND: all selected skills must match, so count is the number of selected skills
+            qs = qs.filter(pk__in=(
+                profile_skills.values("profile_id").annotate(n=Count("skill_id"))
+                .filter(n=len(skill_ids)).values("profile_id")
+            )).annotate(matched=Value(len(skill_ids)))
+        else:
+            # OR: count how many of the selected skills each candidate has
+            qs = qs.filter(pk__in=profile_skills.values("profile_id")).annotate(matched=Subquery(
+                profile_skills.filter(profile_id=OuterRef("pk")).values("profile_id")
+                .annotate(n=Count("skill_id")).values("n"),
+                output_field=IntegerField(),
+            ))
+
+    # Orderings end in username and id so candidate_search can page them by keyset
+    qs = qs.annotate(username=F("user__username"))
+    if skill_ids and project_keyword:
+        qs = qs.annotate(relevance=ExpressionWrapper(
+            F("matched") * SKILL_MATCH_WEIGHT + F("text_score"), output_field=FloatField()
+        ))
+        return qs.order_by("-relevance", "username", "id")
+    if skill_ids:
+        return qs.order_by("-matched", "username", "id")
+    if project_keyword:
+        return qs.order_by("-text_score", "username", "id")
+    # Order by username when no skills selected
+    return qs.order_by("username", "id")
+
+def _rank_skill_matches(location, project_keyword, skills, match_all_skills):
+    """
+    (SkillMatch, relevance) of the candidates for a search with skills, from the in-memory
+    skill_postings index. Location and keywords are still matched in SQL, which returns the ids
+    (and text scores) passing them; no list of profile ids is sent to the database.
+    Relevance follows _filter_candidates: matched skills, weighted and plus text_score with keywords.
+    """
+    match = skill_postings.match({s.id for s in skills}, match_all_skills)
+    if not (location or project_keyword):
+        return match, match.matched.astype(np.float64)
+
+    passing = Profile.objects.filter(search_doc__role='seeker', search_doc__privacy_level=Profile.PRIVACY_PUBLIC)
+    passing = _filter_text(passing, location, "")
+    if project_keyword:
+        rows = get_candidate_search_backend().scores(passing, project_keyword)
+    else:
+        rows = [(profile_id, 0.0) for profile_id in passing.values_list("id", flat=True)]
+    passing_ids = np.array([profile_id for profile_id, _ in rows], dtype=np.int64)
+    text_scores = np.array([score or 0.0 for _, score in rows], dtype=np.float64)
+    _, match_rows, passing_rows = np.intersect1d(
+        match.profile_ids, passing_ids, assume_unique=True, return_indices=True
+    )
+    match = match.take(match_rows)
+    if not project_keyword:
+        return match, match.matched.astype(np.float64)
+    return match, match.matched * SKILL_MATCH_WEIGHT + text_scores[passing_rows]
+
+def _skill_match_page(match, relevance, cursor):
+    """
+    keyset_page for the result of _rank_skill_matches: pages ordered by relevance (highest
+    first), username and id, with cursors holding those three values. Returns
+    (profile ids of the page, their matched counts, next_cursor).
+    """
+    rows = np.arange(len(match.profile_ids))
+    position = decode_cursor(cursor, 3)
+    if position is not None:
+        score, username, profile_id = position
+        try:
+            after = (relevance < score) | (relevance == score) & (
+                (match.usernames > username) | (match.usernames == username) & (match.profile_ids > profile_id)
+            )
+            rows = rows[after]
+        except (TypeError, ValueError):
+            # A tampered cursor whose values don't fit: start from the top
+            pass
+
+    rows = rows[np.lexsort((match.profile_ids[rows], match.username_ranks[rows], -relevance[rows]))]
+    page = rows[:CANDIDATE_PAGE_SIZE + 1]
+    next_cursor = None
+    if len(page) > CANDIDATE_PAGE_SIZE:
+        page = page[:CANDIDATE_PAGE_SIZE]
+        last = page[-1]
+        next_cursor = encode_cursor([float(relevance[last]), match.usernames[last], int(match.profile_ids[last])])
+    return match.profile_ids[page].tolist(), match.matched[page].tolist(), next_cursor
+
+def _candidate_count(results, filters):
+    """results.count(), cached per normalized filter set until a profile changes"""
+    digest = hashlib.md5(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    key = f'candidate_search_count:{matching.profile_version()}:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = results.count()
+        cache.set(key, count, CANDIDATE_COUNT_CACHE_SECONDS)
+    return count
+
 def candidate_search(request):
     # US-11: recruiter searches candidates
     form = CandidateSearchForm(request.GET or None)
     filters_applied = False
-    # Start with all job seekers (users with role='seeker')
-    User = get_user_model()
-    seeker_users = User.objects.filter(role='seeker')
-    
-    # Get profiles for these users with public privacy level
-    qs = Profile.objects.filter(
-        user__in=seeker_users,
-        privacy_level=Profile.PRIVACY_PUBLIC
-    ).select_related("user").prefetch_related("skills", "projects")
-    
-    # Also get users without profiles to include them in search results
-    users_without_profiles = seeker_users.filter(profile__isnull=True)
-    
-    if form.is_valid():
-        loc = form.cleaned_data.get("location")
-        if loc:
-            qs = qs.filter(location__icontains=loc)
 
-        kw = form.cleaned_data.get("project_keyword")
-        if kw:
-            qs = qs.filter(Q(projects__title__icontains=kw) | Q(projects__description__icontains=kw))
+    # Public profiles of job seekers; seekers without a profile are listed on their own page
+    qs = _searchable_profiles()
 
+    location, project_keyword, sel_skills, match_all_skills = "", "", [], False
+    if form.is_valid():
+        location = form.cleaned_data.get("location") or ""
+        project_keyword = form.cleaned_data.get("project_keyword") or ""
         sel_skills = list(form.cleaned_data.get("skills") or [])
-        if sel_skills:
-            if form.cleaned_data.get("match_all_skills"):
-                for s in sel_skills:
-                    qs = qs.filter(skills=s)       # AND
-                # For AND matching, all selected skills must match, so count is the number of selected skills
-                qs = qs.annotate(matched=Value(len(sel_skills)))
-            else:
-                qs = qs.filter(skills__in=sel_skills)  # OR
-                # For OR matching, count how many of the selected skills each candidate has
-                qs = qs.annotate(
-                    matched=Count("skills", filter=Q(skills__in=sel_skills), distinct=True)
-                )
-            qs = qs.order_by("-matched", "user__username")
-        else:
-            # Order by username when no skills selected
-            qs = qs.order_by("user__username")
-        filters_applied = bool(
-            form.cleaned_data.get("location") or
-            form.cleaned_data.get("project_keyword") or
-            (form.cleaned_data.get("skills") and len(form.cleaned_data.get("skills")) > 0)
-        )
-
-    # Always set results to the queryset (even if form is not valid, show all results)
-    results = qs.distinct()
+        match_all_skills = bool(form.cleaned_data.get("match_all_skills"))
+        filters_applied = bool(location or project_keyword or sel_skills)
 
     # candidate recommedation functionality
     matches = {}   # job → list of matching profiles
-    if not filters_applied:
-        for job in Job.objects.filter(posted_by=request.user):
-            # convert job skills text field into a lowercase set
-            job_skill_set = {
-                s.lower().strip()
-                for s in job.skills.split(",")
-                if s.strip() != ""
-            }
-
-            matches[job] = []  # initialize list for this job
-
-            # Loop through every candidate profile you already iterated earlier
-            for profile in qs:   # <-- use your existing qs from above
-                candidate_skill_set = {
-                    s.name.lower().strip()
-                    for s in profile.skills.all()
-                }
-
-                overlap = len(job_skill_set & candidate_skill_set)
-
-                if overlap >= 2:
-                    matches[job].append(profile)
+    if not filters_applied and request.user.is_authenticated:
+        jobs = list(Job.objects.filter(posted_by=request.user))
+        job_matches = matching.recommended_candidates(request.user)
+        profiles = Profile.objects.select_related("user").prefetch_related("skills", "projects").in_bulk(
+            {profile_id for ranked in job_matches.values() for profile_id, _ in ranked}
+        )
+        for job in jobs:
+            matches[job] = [
+                profiles[profile_id]
+                for profile_id, _ in job_matches.get(job.id, ())
+                if profile_id in profiles
+            ]
 
     # Only exclude recommended IDs if we have matches
-    recommended_ids = [p.id for profiles in matches.values() for p in profiles]
-    if recommended_ids:
-        results = results.exclude(id__in=recommended_ids)
+    recommended_ids = sorted(p.id for profiles in matches.values() for p in profiles)
     has_matches = any(matches.values()) # bool that returns true if there are any candidate recommendations
-    return render(request, "accounts/candidate_search.html", {"form": form, "results": results, "users_without_profiles": users_without_profiles, "matches": matches, "has_matches": has_matches})
+
+    # Keyset pages of CANDIDATE_PAGE_SIZE; ?cursor= continues, with format=json for "Load more"
+    cursor = request.GET.get("cursor")
+    if sel_skills:
+        # Ranked and paged in memory; only the ids of the page shown are looked up
+        skill_match, relevance = _rank_skill_matches(location, project_keyword, sel_skills, match_all_skills)
+        if recommended_ids:
+            keep = ~np.isin(skill_match.profile_ids, recommended_ids)
+            skill_match, relevance = skill_match.take(keep), relevance[keep]
+        page_ids, page_matched, next_cursor = _skill_match_page(skill_match, relevance, cursor)
+        profiles = qs.in_bulk(page_ids)
+        page = []
+        for profile_id, matched in zip(page_ids, page_matched):
+            if profile_id in profiles:
+                profiles[profile_id].matched = matched
+                page.append(profiles[profile_id])
+        total_count = len(skill_match.profile_ids)
+    else:
+        # Even if the form is not valid, show all results
+        results = _filter_candidates(qs, location, project_keyword, [], False)
+        ordering = results.query.order_by
+        if recommended_ids:
+            results = results.exclude(id__in=recommended_ids)
+        page, next_cursor = keyset_page(results, cursor, ordering, CANDIDATE_PAGE_SIZE)
+        total_count = None
+
+    page_query = request.GET.copy()
+    for key in ("cursor", "format"):
+        page_query.pop(key, None)
+
+    if request.GET.get("format") == "json":
+        html = render_to_string("accounts/candidate_card_list.html", {"profiles": page}, request=request)
+        return JsonResponse({"html": html, "next_cursor": next_cursor})
+
+    if total_count is None:
+        total_count = _candidate_count(results, {
+            "location": search_docs.normalize_text(location),
+            "keyword": search_docs.normalize_text(project_keyword),
+            "excluded": recommended_ids,
+        })
+    return render(request, "accounts/candidate_search.html", {
+        "form": form,
+        "results": page,
+        "next_cursor": next_cursor,
+        "page_query": page_query.urlencode(),
+        "total_count": total_count,
+        "matches": matches,
+        "has_matches": has_matches,
+    })
+
+def seekers_without_profiles(request):
+    """Job seekers who haven't created a profile yet, paged by username"""
+    User = get_user_model()
+    users = User.objects.filter(role="seeker", profile__isnull=True)
+    page, next_cursor = keyset_page(users, request.GET.get("cursor"), ("username", "id"), CANDIDATE_PAGE_SIZE)
+    if request.GET.get("format") == "json":
+        html = render_to_string("accounts/seeker_card_list.html", {"seekers": page}, request=request)
+        return JsonResponse({"html": html, "next_cursor": next_cursor})
+    return render(request, "accounts/seekers_without_profiles.html", {"seekers": page, "next_cursor": next_cursor})
 
 def _execute_saved_search_query(saved_search):
     """
     Helper function to execute a saved search query and return matching profiles.
     This replicates the logic from candidate_search view.
     """
-    User = get_user_model()
-    seeker_users = User.objects.filter(role='seeker')
-    
-    # Get profiles for these users with public privacy level
-    qs = Profile.objects.filter(
-        user__in=seeker_users,
-        privacy_level=Profile.PRIVACY_PUBLIC
-    ).select_related("user").prefetch_related("skills", "projects")
-    
-    # Apply location filter
-    if saved_search.location:
-        qs = qs.filter(location__icontains=saved_search.location)
-    
-    # Apply project keyword filter
-    if saved_search.project_keyword:
-        qs = qs.filter(Q(projects__title__icontains=saved_search.project_keyword) | 
-                      Q(projects__description__icontains=saved_search.project_keyword))
-    
-    # Apply skills filter
-    sel_skills = list(saved_search.skills.all())
-    if sel_skills:
-        if saved_search.match_all_skills:
-            for s in sel_skills:
-                qs = qs.filter(skills=s)  # AND
-            qs = qs.annotate(matched=Value(len(sel_skills)))
-        else:
-            qs = qs.filter(skills__in=sel_skills)  # OR
-            qs = qs.annotate(
-                matched=Count("skills", filter=Q(skills__in=sel_skills), distinct=True)
-            )
-        qs = qs.order_by("-matched", "user__username")
-    else:
-        qs = qs.order_by("user__username")
-    
-    return qs.distinct()
+    return _filter_candidates(
+        _searchable_profiles(),
+        location=saved_search.location,
+        project_keyword=saved_search.project_keyword,
+        skills=saved_search.skills.all(),
+        match_all_skills=saved_search.match_all_skills,
+    )
 
 @login_required
 def save_candidate_search(request):
@@ -604,16 +767,26 @@ def update_commute_radius(request):
 # Messaging views
 @login_required
 def conversations_list(request):
-    """List all conversations for the current user"""
+    """List all conversations for the current user, with the last message and unread count of each"""
     if request.user.role == 'recruiter':
-        conversations = Conversation.objects.filter(recruiter=request.user).order_by('-updated_at')
+        conversations = Conversation.objects.filter(recruiter=request.user).select_related('candidate__profile')
         template_name = 'accounts/recruiter_conversations.html'
     elif request.user.role == 'seeker':
-        conversations = Conversation.objects.filter(candidate=request.user).order_by('-updated_at')
+        conversations = Conversation.objects.filter(candidate=request.user).select_related('recruiter__profile')
         template_name = 'accounts/candidate_conversations.html'
     else:
         return redirect('home.index')
     
+    last_message = Message.objects.filter(conversation=OuterRef('pk')).order_by('-created_at', '-id')
+    conversations = conversations.select_related('job').annotate(
+        last_message_content=Subquery(last_message.values('content')[:1]),
+        last_message_at=Subquery(last_message.values('created_at')[:1]),
+        last_message_sender_id=Subquery(last_message.values('sender_id')[:1]),
+        unread_count=Count(
+            'messages', filter=Q(messages__is_read=False) & ~Q(messages__sender=request.user)
+        ),
+    ).order_by('-updated_at')
+    
     template_data = {
         'title': 'Messages',
         'conversations': conversations
@@ -621,21 +794,52 @@ def conversations_list(request):
     
     return render(request, template_name, {'template_data': template_data})
 
+MESSAGE_PAGE_SIZE = 50
+
+def _message_page(conversation, anchor=None):
+    """
+    Up to MESSAGE_PAGE_SIZE messages preceding ``anchor`` (or the latest ones), oldest first,
+    and whether there are older ones still
+    """
+    history = conversation.messages.select_related('sender').order_by('-created_at', '-id')
+    if anchor is not None:
+        history = history.filter(
+            Q(created_at__lt=anchor.created_at) | Q(created_at=anchor.created_at, id__lt=anchor.id)
+        )
+    page = list(history[:MESSAGE_PAGE_SIZE + 1])
+    has_more = len(page) > MESSAGE_PAGE_SIZE
+    return page[:MESSAGE_PAGE_SIZE][::-1], has_more
+
 @login_required
 def conversation_detail(request, conversation_id):
-    """View and send messages in a conversation"""
+    """
+    View and send messages in a conversation.
+    Shows the latest MESSAGE_PAGE_SIZE messages, or with ?before=<message id> the page of
+    older messages preceding that one; with &format=json that page is returned as an HTML fragment.
+    """
     conversation = get_object_or_404(Conversation, id=conversation_id)
     
     # Check if user is part of this conversation
-    if request.user not in [conversation.recruiter, conversation.candidate]:
+    if request.user.id not in [conversation.recruiter_id, conversation.candidate_id]:
         messages.error(request, 'You are not authorized to view this conversation.')
         return redirect('accounts.conversations_list')
     
-    # Get messages for this conversation
-    messages_list = conversation.messages.all()
+    # Scrollback: the page of messages just before ?before=
+    before = request.GET.get('before', '')
+    anchor = conversation.messages.filter(id=before).first() if before.isdigit() else None
+    if request.GET.get('format') == 'json':
+        if anchor is None:
+            return JsonResponse({'error': 'Unknown message.'}, status=400)
+        older, has_more = _message_page(conversation, anchor)
+        html = render_to_string('accounts/message_list.html', {'messages_list': older}, request=request)
+        return JsonResponse({'html': html, 'before': older[0].id if has_more else None})
+    
+    # Get the latest messages for this conversation, or those before the anchor
+    messages_list, has_more = _message_page(conversation, anchor)
     
-    # Mark messages as read for the current user
-    messages_list.exclude(sender=request.user).update(is_read=True)
+    # Mark messages as read for the current user; only unread rows are touched
+    if conversation.messages.filter(is_read=False).exclude(sender=request.user).update(is_read=True):
+        invalidate_unread_count(request.user.id)
     
     if request.method == 'POST':
         form = MessageForm(request.POST)
@@ -648,6 +852,16 @@ def conversation_detail(request, conversation_id):
             # Update conversation timestamp
             conversation.save()
             
+            # Push the message to both participants' open pages
+            events.publish_to_users([conversation.recruiter_id, conversation.candidate_id], 'message', {
+                'id': message.id,
+                'conversation_id': conversation.id,
+                'sender_id': request.user.id,
+                'sender': request.user.username,
+                'content': message.content,
+                'created_at': date_format(timezone.localtime(message.created_at), 'M d, Y g:i A'),
+            })
+            
             return redirect('accounts.conversation_detail', conversation_id=conversation.id)
     else:
         form = MessageForm()
@@ -659,6 +873,7 @@ def conversation_detail(request, conversation_id):
         'title': f'Conversation with {other_user.username}',
         'conversation': conversation,
         'messages': messages_list,
+        'earlier_before': messages_list[0].id if has_more else None,
         'form': form,
         'other_user': other_user
     }
@@ -815,16 +1030,18 @@ def applicant_clusters_api(request):
     """
     API endpoint that returns clustered applicant data.
     Clusters are defined by a 50-mile radius, and a cluster must have more than 1 candidate.
+    Served from the recruiter's saved cluster snapshot (see accounts.clusters), optionally
+    for a single job with ?job=<id>, with an ETag so unchanged clusters aren't resent.
     """
-    from jobs.models import Application
     import traceback
     
     try:
         # Get all unique applicants who have applied to jobs posted by this recruiter
         recruiter_jobs = Job.objects.filter(posted_by=request.user)
+        recruiter_jobs_count = recruiter_jobs.count()
         
         # Handle case where recruiter has no jobs
-        if not recruiter_jobs.exists():
+        if not recruiter_jobs_count:
             return JsonResponse({
                 "type": "FeatureCollection",
                 "features": [],
@@ -838,94 +1055,31 @@ def applicant_clusters_api(request):
                 }
             })
         
-        applications = Application.objects.filter(job__in=recruiter_jobs).select_related('applicant')
-        
-        # Get unique applicants with valid coordinates
-        applicants_with_coords = []
-        seen_applicants = set()
-        
-        for app in applications:
-            applicant = app.applicant
-            if applicant.id in seen_applicants:
-                continue
-            seen_applicants.add(applicant.id)
-            
-            # Check if applicant has a profile with coordinates
-            try:
-                profile = applicant.profile
-            except (Profile.DoesNotExist, AttributeError):
-                continue
-            
-            if profile and hasattr(profile, 'latitude') and hasattr(profile, 'longitude') and profile.latitude is not None and profile.longitude is not None:
-                try:
-                    lat = float(profile.latitude)
-                    lng = float(profile.longitude)
-                    # Validate coordinates are reasonable (latitude: -90 to 90, longitude: -180 to 180)
-                    if -90 <= lat <= 90 and -180 <= lng <= 180:
-                        applicants_with_coords.append({
-                            'id': applicant.id,
-                            'username': applicant.username,
-                            'lat': lat,
-                            'lng': lng,
-                            'location': profile.location or '',
-                        })
-                except (TypeError, ValueError, InvalidOperation):
-                    continue
-        
-        # Cluster applicants by 50-mile radius (approximately 80.47 km)
-        CLUSTER_RADIUS_KM = 80.47  # 50 miles in kilometers
+        job_id = request.GET.get('job')
+        if job_id:
+            if not job_id.isdigit():
+                raise Http404
+            job_id = get_object_or_404(recruiter_jobs, pk=job_id).pk
+        else:
+            job_id = None
         
-        def haversine_km(lat1, lon1, lat2, lon2):
-            """Calculate distance between two points in kilometers"""
-            R = 6371.0
-            dlat = radians(lat2 - lat1)
-            dlon = radians(lon2 - lon1)
-            a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
-            return 2 * R * asin(sqrt(a))
+        snapshot = clusters.get_snapshot(request.user.id, job_id)
+        etag = f'"{snapshot.etag}-{recruiter_jobs_count}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
         
-        clusters = []
-        
-        for applicant in applicants_with_coords:
-            assigned = False
-            # Check if this applicant belongs to any existing cluster
-            for cluster in clusters:
-                cluster_center_lat = cluster['center_lat']
-                cluster_center_lng = cluster['center_lng']
-                distance = haversine_km(
-                    cluster_center_lat, cluster_center_lng,
-                    applicant['lat'], applicant['lng']
-                )
-                
-                if distance <= CLUSTER_RADIUS_KM:
-                    # Add to existing cluster
-                    cluster['applicants'].append(applicant)
-                    # Update cluster center (average of all points)
-                    total_lat = sum(a['lat'] for a in cluster['applicants'])
-                    total_lng = sum(a['lng'] for a in cluster['applicants'])
-                    count = len(cluster['applicants'])
-                    cluster['center_lat'] = total_lat / count
-                    cluster['center_lng'] = total_lng / count
-                    cluster['count'] = count
-                    assigned = True
-                    break
-            
-            if not assigned:
-                # Create new cluster
-                clusters.append({
-                    'center_lat': applicant['lat'],
-                    'center_lng': applicant['lng'],
-                    'applicants': [applicant],
-                    'count': 1
-                })
+        state = snapshot.state
+        usernames = {user_id: username for user_id, username, _, _ in state['applicants']}
         
         # Filter clusters to only include those with more than 1 candidate
-        valid_clusters = [c for c in clusters if c['count'] > 1]
+        valid_clusters = [c for c in state['clusters'] if len(c['keys']) > 1]
         
         # Convert to GeoJSON format
         features = []
         for cluster in valid_clusters:
             # Get list of applicant usernames for the popup
-            applicant_names = [a['username'] for a in cluster['applicants']]
+            applicant_names = [usernames[user_id] for user_id in cluster['keys']]
             
             features.append({
                 "type": "Feature",
@@ -934,7 +1088,7 @@ def applicant_clusters_api(request):
                     "coordinates": [cluster['center_lng'], cluster['center_lat']]
                 },
                 "properties": {
-                    "count": cluster['count'],
+                    "count": len(cluster['keys']),
                     "applicants": applicant_names,
                     "center_lat": cluster['center_lat'],
                     "center_lng": cluster['center_lng']
@@ -943,19 +1097,23 @@ def applicant_clusters_api(request):
         
         # Add debug information (can be removed in production)
         debug_info = {
-            "total_applications": applications.count(),
-            "unique_applicants": len(seen_applicants),
-            "applicants_with_coords": len(applicants_with_coords),
-            "total_clusters": len(clusters),
+            "total_applications": state['total_applications'],
+            "unique_applicants": len(state['applicants']),
+            "applicants_with_coords": sum(1 for applicant in state['applicants'] if applicant[2] is not None),
+            "total_clusters": len(state['clusters']),
             "valid_clusters": len(valid_clusters),
-            "recruiter_jobs_count": recruiter_jobs.count()
+            "recruiter_jobs_count": recruiter_jobs_count
         }
         
-        return JsonResponse({
+        response = JsonResponse({
             "type": "FeatureCollection", 
             "features": features,
             "debug": debug_info
         })
+        response['ETag'] = etag
+        return response
+    except Http404:
+        raise
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
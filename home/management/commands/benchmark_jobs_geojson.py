@@ -0,0 +1,121 @@
+"""
+Management command to benchmark the /api/jobs/ radius query as the Job table grows.
+
+Each size is measured on a throwaway test database: a fixed cluster of jobs
+around the query point plus N jobs scattered over the globe, so the result
+size stays the same and only the table size changes. With the grid geo
+index the request latency should stay roughly flat; the one-off index load
+is reported separately. --baseline also times the old full-table
+haversine scan for comparison.
+
+Example: python manage.py benchmark_jobs_geojson --sizes 1000 10000 100000 1000000
+"""
+
+import random
+import statistics
+import time
+from math import radians, sin, cos, asin, sqrt
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+
+from home.views import jobs_geojson
+from jobfinder.geo import job_index
+from jobs.models import Job
+
+QUERY_LAT, QUERY_LNG = 33.7756, -84.3963
+RADIUS_KM = 50
+CLUSTER_SIZE = 200
+
+
+def _full_scan(lat, lng, radius_km):
+    """The pre-index implementation: haversine over every geocoded job"""
+    count = 0
+    for jlat, jlng in Job.objects.exclude(latitude__isnull=True).values_list('latitude', 'longitude'):
+        jlat, jlng = float(jlat), float(jlng)
+        dlat = radians(jlat - lat)
+        dlon = radians(jlng - lng)
+        a = sin(dlat/2)**2 + cos(radians(lat)) * cos(radians(jlat)) * sin(dlon/2)**2
+        if 2 * 6371.0 * asin(sqrt(a)) <= radius_km:
+            count += 1
+    return count
+
+
+class Command(BaseCommand):
+    help = 'Benchmark /api/jobs/ radius queries for growing Job table sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per size')
+        parser.add_argument('--baseline', action='store_true', help='Also time the old full-table scan')
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self._run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _run(self, options):
+        rng = random.Random(42)
+        user = get_user_model().objects.create_user('bench', role='recruiter')
+        factory = RequestFactory()
+
+        # Jobs within ~30 km of the query point: the expected result set at every size
+        self._insert(user, [
+            (QUERY_LAT + rng.uniform(-0.2, 0.2), QUERY_LNG + rng.uniform(-0.2, 0.2))
+            for _ in range(CLUSTER_SIZE)
+        ])
+        inserted = 0
+
+        self.stdout.write(
+            f'{"jobs":>10} {"results":>8} {"median ms":>10} {"p95 ms":>8} {"load ms":>8} {"scan ms":>9}'
+        )
+        for size in sorted(options['sizes']):
+            self._insert(user, (
+                (rng.uniform(-80, 80), rng.uniform(-180, 180)) for _ in range(size - inserted)
+            ))
+            inserted = size
+
+            # bulk_create sends no signals, so reload the index explicitly
+            job_index.invalidate()
+            start = time.perf_counter()
+            len(job_index)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            request = factory.get('/api/jobs/', {'lat': QUERY_LAT, 'lng': QUERY_LNG, 'radius_km': RADIUS_KM})
+            request.user = user
+            jobs_geojson(request)  # build the arrays outside the timed loop
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                response = jobs_geojson(request)
+                timings.append((time.perf_counter() - start) * 1000)
+            results = response.content.count(b'"Feature"')
+
+            scan = ''
+            if options['baseline']:
+                start = time.perf_counter()
+                _full_scan(QUERY_LAT, QUERY_LNG, RADIUS_KM)
+                scan = f'{(time.perf_counter() - start) * 1000:.1f}'
+
+            p95 = sorted(timings)[max(0, int(len(timings) * 0.95) - 1)]
+            self.stdout.write(
+                f'{size + CLUSTER_SIZE:>10} {results:>8} {statistics.median(timings):>10.2f} {p95:>8.2f} '
+                f'{load_ms:>8.0f} {scan:>9}'
+            )
+
+    def _insert(self, user, coords, batch_size=10000):
+        batch = []
+        for lat, lng in coords:
+            batch.append(Job(
+                title='Benchmark job', skills='', posted_by=user,
+                latitude=round(lat, 6), longitude=round(lng, 6),
+            ))
+            if len(batch) >= batch_size:
+                Job.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Job.objects.bulk_create(batch)
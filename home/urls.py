@@ -6,4 +6,6 @@ urlpatterns = [
 
     path('jobs/map/', views.jobs_map, name='jobs.map'),      # UI page
     path("api/jobs/", views.jobs_geojson, name="api.jobs"),
+    path("api/jobs/clusters/", views.jobs_clusters, name="api.jobs_clusters"),
+    path("api/skills/", views.skills_autocomplete, name="api.skills"),
 ]
@@ -2,8 +2,11 @@ from django.shortcuts import render
 from jobs.models import Job
 from django.http import JsonResponse
 from django.contrib.auth.decorators import user_passes_test
-from math import radians, sin, cos, asin, sqrt
-from decimal import InvalidOperation
+from django.core.cache import caches
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from jobfinder.geo import job_index, grid_clusters, point_tiles, tiles_for_bbox
+from accounts.skill_index import skill_index
 
 def is_seeker(user):
     return user.is_authenticated and getattr(user, "role", None) == "seeker"
@@ -37,15 +40,6 @@ def jobs_map(request):
     }
     return render(request, 'home/jobs_map.html', {'template_data': template_data})
 
-# --- Helpers for distance filtering ---
-def _haversine_km(lat1, lon1, lat2, lon2):
-    # Calculate the great circle distance between two points (km)
-    R = 6371.0
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
-    return 2 * R * asin(sqrt(a))
-    
 def jobs_geojson(request):
     # /api/jobs/?lat=33.7756&lng=-84.3963&radius_km=50
     # Check if user is authenticated
@@ -63,36 +57,135 @@ def jobs_geojson(request):
     except (TypeError, ValueError):
         radius_km = 50.0
 
-    qs = Job.objects.exclude(latitude__isnull=True).exclude(longitude__isnull=True)
-
-    def haversine(lat1, lon1, lat2, lon2):
-        R = 6371.0
-        dlat = radians(lat2 - lat1)
-        dlon = radians(lon2 - lon1)
-        a = sin(dlat/2)**2 + cos(radians(lat1))*cos(radians(lat2))*sin(dlon/2)**2
-        return 2 * R * asin(sqrt(a))
+    # Radius search runs on the in-memory geo index; the DB only hydrates the hits
+    job_ids, distances = job_index.radius(lat, lng, radius_km)
+    jobs = Job.objects.only(
+        "id", "title", "company", "location", "latitude", "longitude"
+    ).in_bulk(job_ids.tolist())
 
     features = []
-    for j in qs:
-        try:
-            jlat = float(j.latitude); jlng = float(j.longitude)
-        except (TypeError, ValueError, InvalidOperation):
+    for job_id, distance in zip(job_ids.tolist(), distances.tolist()):
+        job = jobs.get(job_id)
+        if job is None:
             continue
-        
-        distance = haversine(lat, lng, jlat, jlng)
-        if distance <= radius_km:
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [float(job.longitude), float(job.latitude)]},
+            "properties": {
+                "id": job.id,
+                "title": job.title,
+                "company": job.company,
+                "location": job.location,
+                "distance_km": round(distance, 2),
+                "detail_url": request.build_absolute_uri(f"/jobs/{job.id}/"),
+            },
+        })
+
+    return JsonResponse({"type": "FeatureCollection", "features": features})
+
+# --- Zoom-aware clustering for the job maps ---
+CLUSTER_GRID = 8            # 8x8 cells per 256px tile, i.e. one cluster per 32px
+INDIVIDUAL_JOBS_ZOOM = 15   # from this zoom on every job is its own feature
+MAX_ZOOM = 20
+MAX_TILES = 256             # a 4K viewport is around 16x10 tiles
+TILE_CACHE_SECONDS = 300
+
+def _job_tile_cache_key(version, z, x, y):
+    return f"job_tile:{version}:{z}:{x}:{y}"
+
+def invalidate_job_tiles(*points):
+    """Drop the cached tiles holding any of these (lat, lng) points, at every zoom; None is skipped"""
+    caches["local"].delete_many([
+        _job_tile_cache_key(job_index.version, z, x, y)
+        for point in points if point is not None
+        for z, x, y in point_tiles(*point, MAX_ZOOM)
+    ])
+
+def _job_tile_features(z, x, y):
+    """
+    Features of one tile; cached per tile and geo index load. Tiles are built from this process's
+    job_index, so they are cached in the process-local cache like the index itself.
+    """
+    cache = caches["local"]
+    key = _job_tile_cache_key(job_index.current_version(), z, x, y)
+    features = cache.get(key)
+    if features is not None:
+        return features
+
+    features = []
+    singles = {}
+    for count, lat, lng, job_ids in grid_clusters(job_index, z, x, y, CLUSTER_GRID):
+        if count == 1 or z >= INDIVIDUAL_JOBS_ZOOM:
+            for job_id in job_ids:
+                singles[job_id] = len(features)
+                features.append(None)
+        else:
             features.append({
                 "type": "Feature",
-                "geometry": {"type": "Point", "coordinates": [jlng, jlat]},
-                "properties": {
-                    "id": j.id,
-                    "title": j.title,
-                    "company": j.company,
-                    "location": j.location,
-                    "distance_km": round(distance, 2),
-                    "detail_url": request.build_absolute_uri(f"/jobs/{j.id}/"),
-                },
+                "geometry": {"type": "Point", "coordinates": [lng, lat]},
+                "properties": {"cluster": True, "count": count},
             })
 
-    return JsonResponse({"type": "FeatureCollection", "features": features})
+    jobs = Job.objects.only(
+        "id", "title", "company", "location", "latitude", "longitude"
+    ).in_bulk(list(singles))
+    for job_id, position in singles.items():
+        job = jobs.get(job_id)
+        if job is None:
+            continue
+        features[position] = {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [float(job.longitude), float(job.latitude)]},
+            "properties": {
+                "cluster": False,
+                "id": job.id,
+                "title": job.title,
+                "company": job.company,
+                "location": job.location,
+                "detail_url": reverse("jobs.detail", args=[job.id]),
+            },
+        }
+    features = [f for f in features if f is not None]
+    cache.set(key, features, TILE_CACHE_SECONDS)
+    return features
 
+def jobs_clusters(request):
+    # /api/jobs/clusters/?bbox=min_lng,min_lat,max_lng,max_lat&zoom=12
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in request.GET["bbox"].split(","))
+        zoom = int(request.GET["zoom"])
+    except (KeyError, ValueError):
+        return JsonResponse({"error": "bbox=min_lng,min_lat,max_lng,max_lat and zoom required"}, status=400)
+    zoom = max(0, min(zoom, MAX_ZOOM))
+
+    tiles = tiles_for_bbox(zoom, max(min_lat, -90.0), max(min_lng, -180.0), min(max_lat, 90.0), min(max_lng, 180.0))
+    if len(tiles) > MAX_TILES:
+        return JsonResponse({"error": "Viewport too large for this zoom"}, status=400)
+
+    features = []
+    for x, y in tiles:
+        features.extend(_job_tile_features(zoom, x, y))
+
+    response = JsonResponse({"type": "FeatureCollection", "zoom": zoom, "features": features})
+    patch_cache_control(response, private=True, max_age=60)
+    return response
+
+
+SKILL_SUGGESTIONS = 10
+
+def skills_autocomplete(request):
+    """
+    GET /api/skills/?prefix=py
+    The most popular skills starting with the prefix, from the in-memory skill index
+    """
+    prefix = request.GET.get('prefix', '')[:64]
+    try:
+        limit = min(max(int(request.GET.get('limit', SKILL_SUGGESTIONS)), 1), 50)
+    except ValueError:
+        limit = SKILL_SUGGESTIONS
+    response = JsonResponse({'results': skill_index.complete(prefix, limit)})
+    patch_cache_control(response, max_age=60)
+    return response
@@ -2,6 +2,8 @@
 ASGI config for jobfinder project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve the site with it (e.g. ``uvicorn jobfinder.asgi:application``) for the
+live updates stream at /events/ (see jobfinder.events).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
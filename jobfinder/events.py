@@ -0,0 +1,144 @@
+"""
+Publish/subscribe for live page updates, streamed to browsers as
+Server-Sent Events by ``event_stream`` (``/events/``).
+
+Events are published to per-user channels (``user:<id>``) from the sync
+views, after the surrounding transaction commits. The default
+InProcessBroker fans them out to the connections held by this process,
+which is enough for a single ASGI worker; a broker shared between
+processes can be swapped in with the ``EVENT_BROKER`` setting (dotted
+path) as long as it offers the same ``publish``, ``subscribe`` and
+``unsubscribe``.
+
+Each open stream is a coroutine waiting on a small queue, so idle
+connections cost no thread. The stream only works under ASGI (e.g.
+``uvicorn jobfinder.asgi:application``); under WSGI it answers 204 and
+pages keep working without live updates.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+
+# Comment line sent on idle streams so proxies don't time them out
+KEEPALIVE_SECONDS = 15
+
+# Events a slow client may fall behind by before further ones are dropped
+QUEUE_SIZE = 100
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+class Subscription:
+    """Events published to a set of channels, queued for one consumer"""
+
+    def __init__(self, broker, channels):
+        self._broker = broker
+        self.channels = list(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    async def get(self):
+        """The next (event, data)"""
+        return await self.queue.get()
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fans events out to the subscribers in this process; publish() is safe from any thread"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        """Start queueing events for ``channels``; call from the consuming event loop"""
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].discard(subscription)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+    def publish(self, channel, event, data):
+        message = (event, data)
+        with self._lock:
+            subscriptions = list(self._subscribers.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(self._deliver, subscription.queue, message)
+
+    @staticmethod
+    def _deliver(queue, message):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        path = getattr(settings, 'EVENT_BROKER', 'jobfinder.events.InProcessBroker')
+        _broker = import_string(path)()
+    return _broker
+
+
+def publish_to_users(user_ids, event, data):
+    """Publish ``event`` to each user's channel once the current transaction commits"""
+    def send():
+        broker = get_broker()
+        for user_id in set(user_ids):
+            broker.publish(user_channel(user_id), event, data)
+    transaction.on_commit(send)
+
+
+def _sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+async def _stream(channels):
+    subscription = get_broker().subscribe(channels)
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                event, data = await asyncio.wait_for(subscription.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield _sse(event, data)
+    finally:
+        # The client went away
+        subscription.close()
+
+
+async def event_stream(request):
+    """Server-Sent Events for the logged in user: pipeline status changes and new messages"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    if not hasattr(request, 'scope'):
+        # A WSGI server would have to hold a thread per stream
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(_stream([user_channel(user.id)]), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
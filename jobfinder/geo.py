@@ -0,0 +1,380 @@
+"""
+Process-local geo index shared by the map and clustering endpoints.
+
+Each ``GeoIndex`` keeps ``key -> (lat, lng)`` points in contiguous NumPy
+arrays sorted by a fixed lat/lng grid cell, so a radius or bounding-box
+query only looks at the cells that overlap it and then runs a vectorized
+haversine on those candidates.
+
+The job index loads lazily from the database on first use and is kept up
+to date by ``post_save``/``post_delete`` signals (see jobs.signals). Writes
+only touch a dict; the arrays are rebuilt on the next query. Since signals only reach the process that made the change, the
+index is also reloaded from the database every ``GEO_INDEX_TTL`` seconds.
+"""
+import math
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+# Grid cell size in degrees (~28 km of latitude)
+CELL_DEG = 0.25
+_LAT_CELLS = int(180 / CELL_DEG)
+_LNG_CELLS = int(360 / CELL_DEG)
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """Great circle distance in km from one point to arrays of points"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(np.asarray(lngs) - lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def bounding_box(lat, lng, radius_km):
+    """
+    Return ``(min_lat, max_lat, lng_ranges)`` enclosing the circle of
+    ``radius_km`` around (lat, lng). ``lng_ranges`` has two ranges when the
+    box wraps across the antimeridian.
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    # Longitude degrees shrink towards the poles; near them take the whole band
+    cos_lat = min(np.cos(np.radians(min_lat)), np.cos(np.radians(max_lat)))
+    if cos_lat <= 1e-6 or radius_km / (KM_PER_DEGREE_LAT * cos_lat) >= 180.0:
+        return min_lat, max_lat, [(-180.0, 180.0)]
+    dlng = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    min_lng, max_lng = lng - dlng, lng + dlng
+    if min_lng < -180.0:
+        return min_lat, max_lat, [(min_lng + 360.0, 180.0), (-180.0, max_lng)]
+    if max_lng > 180.0:
+        return min_lat, max_lat, [(min_lng, 180.0), (-180.0, max_lng - 360.0)]
+    return min_lat, max_lat, [(min_lng, max_lng)]
+
+
+def _to_point(lat, lng):
+    """Float (lat, lng), or None when either value is missing or out of range"""
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError, ArithmeticError):
+        return None
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        return None
+    return lat, lng
+
+
+def _lat_cell(lat):
+    return np.clip(((np.asarray(lat) + 90.0) // CELL_DEG).astype(np.int64), 0, _LAT_CELLS - 1)
+
+
+def _lng_cell(lng):
+    return np.clip(((np.asarray(lng) + 180.0) // CELL_DEG).astype(np.int64), 0, _LNG_CELLS - 1)
+
+
+class GeoIndex:
+    def __init__(self, loader, ttl=None):
+        # loader() yields (key, lat, lng) rows for every point to index
+        self._loader = loader
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._points = None
+        self._loaded_at = 0.0
+        self._arrays = None
+        # Bumped on every (re)load, so results derived from the index can be cached by version;
+        # single changes are invalidated where they are made (see jobs.signals)
+        self.version = 0
+
+    # --- maintenance ---
+
+    def _ttl_seconds(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, 'GEO_INDEX_TTL', 300)
+
+    def _ensure_loaded(self):
+        # Caller holds the lock
+        if self._points is not None and time.monotonic() - self._loaded_at < self._ttl_seconds():
+            return
+        points = {}
+        for key, lat, lng in self._loader():
+            point = _to_point(lat, lng)
+            if point is not None:
+                points[key] = point
+        self._points = points
+        self._loaded_at = time.monotonic()
+        self._arrays = None
+        self.version += 1
+
+    def _ensure_arrays(self):
+        # Caller holds the lock; returns (cell_keys, keys, lats, lngs) sorted by cell
+        self._ensure_loaded()
+        if self._arrays is None:
+            count = len(self._points)
+            keys = np.fromiter(self._points.keys(), dtype=np.int64, count=count)
+            coords = np.fromiter(
+                (c for point in self._points.values() for c in point), dtype=np.float64, count=2 * count
+            ).reshape(count, 2)
+            lats, lngs = coords[:, 0], coords[:, 1]
+            cells = _lat_cell(lats) * _LNG_CELLS + _lng_cell(lngs)
+            order = np.argsort(cells, kind='stable')
+            self._arrays = (cells[order], keys[order], lats[order].copy(), lngs[order].copy())
+        return self._arrays
+
+    def upsert(self, key, lat, lng):
+        """
+        Add or move a point; missing/invalid coordinates remove it.
+        Returns (previous point, new point), either None when absent.
+        """
+        point = _to_point(lat, lng)
+        with self._lock:
+            if self._points is None:
+                # Not loaded yet: the first query will read the current rows
+                return None, point
+            previous = self._points.get(key)
+            if point is None:
+                if self._points.pop(key, None) is not None:
+                    self._arrays = None
+            elif previous != point:
+                self._points[key] = point
+                self._arrays = None
+            return previous, point
+
+    def remove(self, key):
+        """Drop a point; returns it, or None if it was not indexed"""
+        with self._lock:
+            if self._points is None:
+                return None
+            previous = self._points.pop(key, None)
+            if previous is not None:
+                self._arrays = None
+            return previous
+
+    def invalidate(self):
+        """Drop everything; the next query reloads from the database"""
+        with self._lock:
+            self._points = None
+            self._arrays = None
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._points)
+
+    def current_version(self):
+        """Version after a TTL reload, if one is due"""
+        with self._lock:
+            self._ensure_loaded()
+            return self.version
+
+    # --- queries ---
+
+    def _candidates(self, min_lat, max_lat, lng_ranges):
+        # Caller holds the lock; positions of points in the grid cells overlapping the box
+        cells, keys, lats, lngs = self._ensure_arrays()
+        slices = []
+        for row in range(int(_lat_cell(min_lat)), int(_lat_cell(max_lat)) + 1):
+            for min_lng, max_lng in lng_ranges:
+                lo = row * _LNG_CELLS + int(_lng_cell(min_lng))
+                hi = row * _LNG_CELLS + int(_lng_cell(max_lng))
+                start, stop = np.searchsorted(cells, [lo, hi + 1])
+                if stop > start:
+                    slices.append(np.arange(start, stop))
+        if not slices:
+            return np.empty(0, dtype=np.int64), keys, lats, lngs
+        return np.concatenate(slices), keys, lats, lngs
+
+    def bbox(self, min_lat, min_lng, max_lat, max_lng):
+        """Keys, lats and lngs of the points inside a box (min_lng > max_lng wraps the antimeridian)"""
+        lng_ranges = [(min_lng, max_lng)] if min_lng <= max_lng else [(min_lng, 180.0), (-180.0, max_lng)]
+        with self._lock:
+            pos, keys, lats, lngs = self._candidates(min_lat, max_lat, lng_ranges)
+            plat, plng = lats[pos], lngs[pos]
+            inside = (plat >= min_lat) & (plat <= max_lat)
+            lng_inside = np.zeros(len(pos), dtype=bool)
+            for lo, hi in lng_ranges:
+                lng_inside |= (plng >= lo) & (plng <= hi)
+            pos = pos[inside & lng_inside]
+            return keys[pos], lats[pos], lngs[pos]
+
+    def radius(self, lat, lng, radius_km):
+        """Keys and distances (km) of the points within radius_km, nearest first"""
+        with self._lock:
+            pos, keys, lats, lngs = self._candidates(*bounding_box(lat, lng, radius_km))
+            dist = haversine_km(lat, lng, lats[pos], lngs[pos])
+            keep = dist <= radius_km
+            pos, dist = pos[keep], dist[keep]
+            order = np.argsort(dist, kind='stable')
+            return keys[pos][order], dist[order]
+
+    def points(self, keys):
+        """Keys, lats and lngs of the given keys that are in the index"""
+        with self._lock:
+            self._ensure_loaded()
+            found = [(key, self._points[key]) for key in keys if key in self._points]
+        return (
+            np.array([key for key, _ in found], dtype=np.int64),
+            np.array([point[0] for _, point in found], dtype=np.float64),
+            np.array([point[1] for _, point in found], dtype=np.float64),
+        )
+
+
+def _load_jobs():
+    from jobs.models import Job
+    return Job.objects.filter(
+        latitude__isnull=False, longitude__isnull=False
+    ).values_list('id', 'latitude', 'longitude').iterator()
+
+
+# Jobs keyed by Job.id
+job_index = GeoIndex(_load_jobs)
+
+
+class GridClusterer:
+    """
+    Greedy "leader" clustering: each point joins the oldest cluster whose
+    centre (the running mean of its members) is within radius_km, otherwise
+    it starts a new cluster.
+
+    Cluster centres are bucketed in a grid whose cells are radius_km tall,
+    so a point is only compared with centres in nearby cells rather than
+    with every cluster. The result is identical to the exhaustive scan.
+    """
+
+    def __init__(self, radius_km):
+        self.radius_km = radius_km
+        self.cell_deg = radius_km / KM_PER_DEGREE_LAT
+        # Each cluster: {'keys': [...], 'sum_lat', 'sum_lng', 'center_lat', 'center_lng'}
+        self.clusters = []
+        self._grid = defaultdict(set)
+
+    @classmethod
+    def from_clusters(cls, radius_km, clusters):
+        """Resume clustering from a previously saved ``clusters`` list"""
+        clusterer = cls(radius_km)
+        clusterer.clusters = clusters
+        for index, cluster in enumerate(clusters):
+            clusterer._grid[clusterer._cell(cluster['center_lat'], cluster['center_lng'])].add(index)
+        return clusterer
+
+    def _cell(self, lat, lng):
+        return int((lat + 90.0) // self.cell_deg), int((lng + 180.0) // self.cell_deg)
+
+    def _nearby(self, lat, lng):
+        min_lat, max_lat, lng_ranges = bounding_box(lat, lng, self.radius_km)
+        row_lo, row_hi = self._cell(min_lat, 0)[0], self._cell(max_lat, 0)[0]
+        for row in range(row_lo, row_hi + 1):
+            for lo, hi in lng_ranges:
+                for col in range(self._cell(0, lo)[1], self._cell(0, hi)[1] + 1):
+                    yield from self._grid.get((row, col), ())
+
+    def add(self, key, lat, lng):
+        """Assign one point; returns the index of its cluster"""
+        best = None
+        lat_r = math.radians(lat)
+        for index in self._nearby(lat, lng):
+            if best is not None and index > best:
+                continue
+            cluster = self.clusters[index]
+            c_lat = math.radians(cluster['center_lat'])
+            a = (math.sin((c_lat - lat_r) / 2) ** 2
+                 + math.cos(lat_r) * math.cos(c_lat) * math.sin(math.radians(cluster['center_lng'] - lng) / 2) ** 2)
+            if 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))) <= self.radius_km:
+                best = index
+
+        if best is None:
+            self.clusters.append({
+                'keys': [key], 'sum_lat': lat, 'sum_lng': lng, 'center_lat': lat, 'center_lng': lng,
+            })
+            best = len(self.clusters) - 1
+            self._grid[self._cell(lat, lng)].add(best)
+            return best
+
+        cluster = self.clusters[best]
+        old_cell = self._cell(cluster['center_lat'], cluster['center_lng'])
+        cluster['keys'].append(key)
+        cluster['sum_lat'] += lat
+        cluster['sum_lng'] += lng
+        count = len(cluster['keys'])
+        cluster['center_lat'] = cluster['sum_lat'] / count
+        cluster['center_lng'] = cluster['sum_lng'] / count
+        new_cell = self._cell(cluster['center_lat'], cluster['center_lng'])
+        if new_cell != old_cell:
+            self._grid[old_cell].discard(best)
+            self._grid[new_cell].add(best)
+        return best
+
+
+# --- Web Mercator tiles (the z/x/y scheme Leaflet uses) ---
+
+MAX_MERCATOR_LAT = 85.0511287798
+
+
+def tile_bounds(z, x, y):
+    """(min_lat, min_lng, max_lat, max_lng) of a tile"""
+    n = 2 ** z
+    min_lng = x / n * 360.0 - 180.0
+    max_lng = (x + 1) / n * 360.0 - 180.0
+    max_lat = float(np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y / n)))))
+    min_lat = float(np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + 1) / n)))))
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def tile_position(z, lats, lngs):
+    """Fractional tile coordinates (x, y) of points at zoom z"""
+    n = 2 ** z
+    lats = np.clip(lats, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)
+    x = (np.asarray(lngs) + 180.0) / 360.0 * n
+    y = (1.0 - np.arcsinh(np.tan(np.radians(lats))) / np.pi) / 2.0 * n
+    return x, y
+
+
+def point_tiles(lat, lng, max_zoom):
+    """The (z, x, y) tile holding a point at each zoom from 0 to max_zoom"""
+    tiles = []
+    for z in range(max_zoom + 1):
+        n = 2 ** z
+        x, y = tile_position(z, np.array([lat]), np.array([lng]))
+        tiles.append((z, int(np.clip(x[0], 0, n - 1)), int(np.clip(y[0], 0, n - 1))))
+    return tiles
+
+
+def tiles_for_bbox(z, min_lat, min_lng, max_lat, max_lng):
+    """The (x, y) tiles at zoom z covering a box"""
+    n = 2 ** z
+    (x0, x1), (y1, y0) = tile_position(z, np.array([min_lat, max_lat]), np.array([min_lng, max_lng]))
+    x0, x1 = int(np.clip(x0, 0, n - 1)), int(np.clip(x1, 0, n - 1))
+    y0, y1 = int(np.clip(y0, 0, n - 1)), int(np.clip(y1, 0, n - 1))
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def grid_clusters(index, z, x, y, grid):
+    """
+    Bucket the points of one tile into a grid x grid raster.
+    Returns one ``(count, center_lat, center_lng, keys)`` tuple per non-empty cell.
+    """
+    keys, lats, lngs = index.bbox(*tile_bounds(z, x, y))
+    if not len(keys):
+        return []
+    px, py = tile_position(z, lats, lngs)
+    px, py = px - x, py - y
+    # Half-open tiles so points on an edge belong to exactly one tile
+    inside = (px >= 0) & (px < 1) & (py >= 0) & (py < 1)
+    keys, lats, lngs = keys[inside], lats[inside], lngs[inside]
+    cells = (py[inside] * grid).astype(np.int64) * grid + (px[inside] * grid).astype(np.int64)
+
+    order = np.argsort(cells, kind='stable')
+    cells, keys, lats, lngs = cells[order], keys[order], lats[order], lngs[order]
+    unique_cells, starts, counts = np.unique(cells, return_index=True, return_counts=True)
+    sum_lat = np.add.reduceat(lats, starts)
+    sum_lng = np.add.reduceat(lngs, starts)
+    return [
+        (int(count), float(s_lat / count), float(s_lng / count), keys[start:start + count].tolist())
+        for start, count, s_lat, s_lng in zip(starts, counts, sum_lat, sum_lng)
+    ]
@@ -66,6 +66,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "accounts.context_processors.unread_messages",
             ],
         },
     },
@@ -85,6 +86,29 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The default cache is shared by every worker process so invalidations
+# (unread message badges, the candidate profile version of accounts.matching)
+# reach all of them.
+# Its table, jobfinder_cache, is created by migration accounts 0018 rather
+# than by createcachetable; change both together.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "jobfinder_cache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    # For results derived from process-local state, such as map tiles built
+    # from the in-process job geo index (jobfinder.geo)
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "jobfinder-local",
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -150,3 +174,28 @@ MEDIA_URL = '/media/'
 
 AUTH_USER_MODEL = "accounts.CustomUser"
 
+
+# Job listing search backend. The FTS5 backend falls back to ORM icontains
+# filters when the database has no jobs_job_fts table.
+JOB_SEARCH_BACKEND = "jobs.search.SQLiteFTSSearchBackend"
+
+# Seconds before the in-process geo indexes (jobfinder.geo) reload from the
+# database, to pick up changes saved by other worker processes.
+GEO_INDEX_TTL = 300
+
+# Pub/sub behind the live updates stream (jobfinder.events). The in-process
+# broker only reaches clients connected to the same ASGI worker.
+EVENT_BROKER = "jobfinder.events.InProcessBroker"
+
+# Seconds before the skill autocomplete index (accounts.skill_index) reloads
+# from the database, to pick up skills and popularity changed elsewhere.
+SKILL_INDEX_TTL = 300
+
+# Candidate keyword search backend. The FTS5 backend falls back to ORM
+# icontains filters when the database has no accounts_candidate_fts table.
+CANDIDATE_SEARCH_BACKEND = "accounts.search.SQLiteFTSCandidateSearch"
+
+# Seconds before the candidate skill filter index (accounts.skill_postings)
+# reloads in full from the database. Profile changes in between are patched
+# in as their search documents are refreshed.
+SKILL_POSTINGS_TTL = 300
@@ -0,0 +1,64 @@
+// Draws job markers from the server-side clustering endpoint (/api/jobs/clusters/).
+// The server aggregates jobs per map tile and zoom, so the browser only gets a
+// bounded number of markers however many jobs are in view.
+function attachJobClusters(map, apiUrl) {
+  const layer = L.layerGroup().addTo(map);
+  let controller = null;
+
+  function clusterIcon(count) {
+    const size = count < 10 ? 30 : count < 100 ? 36 : count < 1000 ? 42 : 50;
+    return L.divIcon({
+      html: `<div style="width:${size}px;height:${size}px;line-height:${size}px;border-radius:50%;` +
+            `background:rgba(220,53,69,0.85);color:#fff;text-align:center;font-weight:bold;">${count}</div>`,
+      className: '',
+      iconSize: [size, size],
+    });
+  }
+
+  async function refresh() {
+    const b = map.getBounds();
+    const params = new URLSearchParams({
+      bbox: [b.getWest(), b.getSouth(), b.getEast(), b.getNorth()].map(v => v.toFixed(5)).join(','),
+      zoom: map.getZoom(),
+    });
+    if (controller) controller.abort();
+    controller = new AbortController();
+
+    let data;
+    try {
+      const resp = await fetch(`${apiUrl}?${params.toString()}`, {
+        headers: { 'Accept': 'application/json' },
+        signal: controller.signal,
+      });
+      if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+      data = await resp.json();
+    } catch (err) {
+      if (err.name !== 'AbortError') console.error('Error loading job clusters:', err);
+      return;
+    }
+
+    layer.clearLayers();
+    (data.features || []).forEach(f => {
+      const [lng, lat] = f.geometry.coordinates;
+      const props = f.properties || {};
+      if (props.cluster) {
+        L.marker([lat, lng], { icon: clusterIcon(props.count) })
+          .on('click', () => map.setView([lat, lng], Math.min(map.getZoom() + 2, map.getMaxZoom())))
+          .addTo(layer);
+      } else {
+        L.marker([lat, lng]).bindPopup(`
+          <div style="min-width:220px">
+            <div><b>${props.title ?? ''}</b></div>
+            <div>${props.company ?? ''}</div>
+            <div>${props.location ?? ''}</div>
+            <a href="${props.detail_url}">View job</a>
+          </div>
+        `).addTo(layer);
+      }
+    });
+  }
+
+  map.on('moveend', refresh);
+  refresh();
+  return layer;
+}
@@ -0,0 +1,21 @@
+// "Load more" links: <a class="load-more" data-target="<list id>" href="?...&cursor=...">.
+// Fetches the next page as {html, next_cursor} (format=json) and appends it to the list.
+document.addEventListener('DOMContentLoaded', () => {
+  document.querySelectorAll('a.load-more').forEach(link => {
+    link.addEventListener('click', async e => {
+      e.preventDefault();
+      const url = new URL(link.href, window.location.href);
+      url.searchParams.set('format', 'json');
+      const resp = await fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } });
+      const data = await resp.json();
+      document.getElementById(link.dataset.target).insertAdjacentHTML('beforeend', data.html);
+      if (data.next_cursor) {
+        const next = new URL(link.href, window.location.href);
+        next.searchParams.set('cursor', data.next_cursor);
+        link.href = next.toString();
+      } else {
+        link.remove();
+      }
+    });
+  });
+});
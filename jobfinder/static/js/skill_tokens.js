@@ -0,0 +1,139 @@
+// Token input for skill pickers (accounts.forms.SkillTokenInput).
+// The page only carries the skills already chosen; suggestions come from the
+// /api/skills/ autocomplete as the user types. Chosen skills stay <option selected>
+// elements of the hidden <select>, so the form posts exactly as before.
+function attachSkillTokens(select) {
+  const apiUrl = select.dataset.autocompleteUrl;
+  const newSkillsInput = select.dataset.newSkillsInput
+    ? document.getElementById(select.dataset.newSkillsInput)
+    : null;
+
+  const wrapper = document.createElement('div');
+  wrapper.className = 'position-relative';
+  const tokens = document.createElement('div');
+  tokens.className = 'mb-2';
+  const input = document.createElement('input');
+  input.type = 'text';
+  input.className = 'form-control';
+  input.placeholder = 'Type to search skills';
+  input.autocomplete = 'off';
+  const menu = document.createElement('div');
+  menu.className = 'list-group position-absolute w-100 shadow-sm';
+  menu.style.zIndex = 1000;
+
+  select.style.display = 'none';
+  select.parentNode.insertBefore(wrapper, select);
+  wrapper.append(tokens, input, menu);
+
+  function renderTokens() {
+    tokens.innerHTML = '';
+    Array.from(select.options).filter(o => o.selected).forEach(option => {
+      const token = document.createElement('span');
+      token.className = 'badge bg-primary me-1 mb-1';
+      token.textContent = option.textContent + ' ';
+      const remove = document.createElement('a');
+      remove.href = '#';
+      remove.className = 'text-white text-decoration-none';
+      remove.textContent = '×';
+      remove.addEventListener('click', e => {
+        e.preventDefault();
+        option.remove();
+        renderTokens();
+      });
+      token.appendChild(remove);
+      tokens.appendChild(token);
+    });
+  }
+
+  function choose(skill) {
+    let option = Array.from(select.options).find(o => o.value === String(skill.id));
+    if (!option) {
+      option = new Option(skill.name, skill.id);
+      select.appendChild(option);
+    }
+    option.selected = true;
+    input.value = '';
+    menu.innerHTML = '';
+    renderTokens();
+  }
+
+  function addNewSkill(name) {
+    // Unknown skills go to the comma-separated "new skills" field, created on save
+    const current = newSkillsInput.value.split(',').map(s => s.trim()).filter(Boolean);
+    if (!current.some(s => s.toLowerCase() === name.toLowerCase())) {
+      current.push(name);
+    }
+    newSkillsInput.value = current.join(', ');
+    input.value = '';
+    menu.innerHTML = '';
+  }
+
+  let controller = null;
+  let timer = null;
+  let suggestions = [];
+
+  async function suggest() {
+    const prefix = input.value.trim();
+    menu.innerHTML = '';
+    suggestions = [];
+    if (!prefix) return;
+    if (controller) controller.abort();
+    controller = new AbortController();
+    try {
+      const resp = await fetch(`${apiUrl}?${new URLSearchParams({ prefix })}`, {
+        headers: { 'Accept': 'application/json' },
+        signal: controller.signal,
+      });
+      suggestions = (await resp.json()).results || [];
+    } catch (e) {
+      return;
+    }
+    suggestions.forEach(skill => {
+      const item = document.createElement('button');
+      item.type = 'button';
+      item.className = 'list-group-item list-group-item-action d-flex justify-content-between';
+      item.textContent = skill.name;
+      const count = document.createElement('small');
+      count.className = 'text-muted';
+      count.textContent = skill.count;
+      item.appendChild(count);
+      item.addEventListener('click', () => choose(skill));
+      menu.appendChild(item);
+    });
+    if (newSkillsInput && !suggestions.some(s => s.name.toLowerCase() === prefix.toLowerCase())) {
+      const item = document.createElement('button');
+      item.type = 'button';
+      item.className = 'list-group-item list-group-item-action fst-italic';
+      item.textContent = `Add "${prefix}" as a new skill`;
+      item.addEventListener('click', () => addNewSkill(prefix));
+      menu.appendChild(item);
+    }
+  }
+
+  input.addEventListener('input', () => {
+    clearTimeout(timer);
+    timer = setTimeout(suggest, 150);
+  });
+  input.addEventListener('keydown', e => {
+    if (e.key !== 'Enter') return;
+    // Enter picks the top suggestion (or adds a new skill) instead of submitting the form
+    e.preventDefault();
+    const prefix = input.value.trim();
+    if (!prefix) return;
+    const exact = suggestions.find(s => s.name.toLowerCase() === prefix.toLowerCase());
+    if (exact || (suggestions.length && !newSkillsInput)) {
+      choose(exact || suggestions[0]);
+    } else if (newSkillsInput) {
+      addNewSkill(prefix);
+    }
+  });
+  document.addEventListener('click', e => {
+    if (!wrapper.contains(e.target)) menu.innerHTML = '';
+  });
+
+  renderTokens();
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+  document.querySelectorAll('select.skill-tokens').forEach(attachSkillTokens);
+});
@@ -20,6 +20,7 @@ from django.urls import path
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from . import events
 
 
 urlpatterns = [
@@ -27,6 +28,7 @@ urlpatterns = [
     path('', include('home.urls')),
     path('accounts/', include('accounts.urls')),
     path('jobs/', include('jobs.urls')),
+    path('events/', events.event_stream, name='events'),
 ]
 
 if settings.DEBUG:
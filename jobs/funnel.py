@@ -0,0 +1,173 @@
+"""
+Application status history and per-job funnel timings.
+
+Every status an application enters is appended to ApplicationStatusEvent
+by ``record_applied`` and ``record_transitions`` (called from the apply and
+status update views). The same calls keep JobStageStats current: how many
+applications entered and left each stage of each job, and a histogram of
+how long they stayed before leaving. Durations are bucketed on a
+logarithmic scale (steps of sqrt(2) from one minute), so the median read
+from the histogram is within about 20% of the exact value and the
+pipeline page never has to scan the log. ``rebuild_stage_stats`` recomputes
+the rollup from the log.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import ApplicationStatusEvent, JobStageStats
+
+# Upper bounds in seconds of the duration buckets; a last, open bucket holds longer stays
+BUCKET_BOUNDS = [60 * 2 ** (i / 2) for i in range(40)]
+
+
+def duration_bucket(seconds):
+    return bisect_left(BUCKET_BOUNDS, max(seconds, 0))
+
+
+def bucket_midpoint(index):
+    """Representative duration of a bucket: the geometric mean of its bounds"""
+    if index == 0:
+        return BUCKET_BOUNDS[0] / 2
+    if index >= len(BUCKET_BOUNDS):
+        return BUCKET_BOUNDS[-1]
+    return (BUCKET_BOUNDS[index - 1] * BUCKET_BOUNDS[index]) ** 0.5
+
+
+def histogram_median(histogram):
+    """Approximate median duration in seconds of a bucket histogram, or None if it is empty"""
+    total = sum(histogram)
+    if not total:
+        return None
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen * 2 >= total:
+            return bucket_midpoint(index)
+
+
+def merge_histograms(histograms):
+    merged = [0] * (len(BUCKET_BOUNDS) + 1)
+    for histogram in histograms:
+        for index, count in enumerate(histogram):
+            merged[index] += count
+    return merged
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return ''
+    if seconds < 3600:
+        return f'{max(round(seconds / 60), 1)} min'
+    if seconds < 86400:
+        return f'{seconds / 3600:.1f} h'
+    return f'{seconds / 86400:.1f} d'
+
+
+def _apply_to_rollup(entered, exits):
+    """
+    entered: {(job_id, status): count}
+    exits: {(job_id, status): [durations in seconds]}
+    """
+    keys = set(entered) | set(exits)
+    if not keys:
+        return
+    with transaction.atomic():
+        for job_id, status in keys:
+            JobStageStats.objects.get_or_create(job_id=job_id, status=status)
+        for (job_id, status), count in entered.items():
+            JobStageStats.objects.filter(job_id=job_id, status=status).update(entered=F('entered') + count)
+        for (job_id, status), durations in exits.items():
+            stats = JobStageStats.objects.select_for_update().get(job_id=job_id, status=status)
+            histogram = stats.duration_histogram or [0] * (len(BUCKET_BOUNDS) + 1)
+            for seconds in durations:
+                histogram[duration_bucket(seconds)] += 1
+            stats.exited = F('exited') + len(durations)
+            stats.duration_histogram = histogram
+            stats.save(update_fields=['exited', 'duration_histogram'])
+
+
+def record_applied(application):
+    """Log the initial status of a new application"""
+    with transaction.atomic():
+        ApplicationStatusEvent.objects.create(
+            application=application, job_id=application.job_id,
+            to_status=application.status, created_at=application.applied_at,
+        )
+        _apply_to_rollup({(application.job_id, application.status): 1}, {})
+
+
+def record_transitions(applications, to_status, at=None):
+    """
+    Log that ``applications`` (with their previous ``status`` still set) moved to ``to_status``.
+    Applications already in ``to_status`` are skipped.
+    """
+    at = at or timezone.now()
+    moved = [app for app in applications if app.status != to_status]
+    if not moved:
+        return
+
+    # A stage was entered at the application's last event; older applications
+    # that predate the log fall back to their last update
+    last_event_at = dict(
+        ApplicationStatusEvent.objects.filter(application_id__in=[app.id for app in moved])
+        .values('application_id')
+        .annotate(last=Max('created_at'))
+        .values_list('application_id', 'last')
+    )
+    entered = defaultdict(int)
+    exits = defaultdict(list)
+    events = []
+    for app in moved:
+        since = last_event_at.get(app.id, app.updated_at)
+        events.append(ApplicationStatusEvent(
+            application_id=app.id, job_id=app.job_id,
+            from_status=app.status, to_status=to_status, created_at=at,
+        ))
+        entered[(app.job_id, to_status)] += 1
+        exits[(app.job_id, app.status)].append((at - since).total_seconds())
+
+    with transaction.atomic():
+        ApplicationStatusEvent.objects.bulk_create(events)
+        _apply_to_rollup(entered, exits)
+
+
+def rebuild_stage_stats():
+    """Recompute JobStageStats from the whole event log; returns the number of rows written"""
+    entered = defaultdict(int)
+    exits = defaultdict(list)
+    previous = {}
+    events = ApplicationStatusEvent.objects.order_by('application_id', 'created_at', 'id').values_list(
+        'application_id', 'job_id', 'to_status', 'created_at'
+    )
+    for application_id, job_id, to_status, created_at in events.iterator():
+        if application_id in previous:
+            prev_status, prev_at = previous[application_id]
+            exits[(job_id, prev_status)].append((created_at - prev_at).total_seconds())
+        entered[(job_id, to_status)] += 1
+        previous[application_id] = (to_status, created_at)
+
+    with transaction.atomic():
+        JobStageStats.objects.all().delete()
+        _apply_to_rollup(entered, exits)
+    return JobStageStats.objects.count()
+
+
+def stage_summary(job_ids):
+    """Entered, exited and median time in stage per status, over the given jobs"""
+    summary = {}
+    rows = defaultdict(list)
+    for stats in JobStageStats.objects.filter(job_id__in=job_ids):
+        rows[stats.status].append(stats)
+    for status, stage_rows in rows.items():
+        median = histogram_median(merge_histograms(s.duration_histogram for s in stage_rows))
+        summary[status] = {
+            'entered': sum(s.entered for s in stage_rows),
+            'exited': sum(s.exited for s in stage_rows),
+            'median_seconds': median,
+            'median_display': format_duration(median),
+        }
+    return summary
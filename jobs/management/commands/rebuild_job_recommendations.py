@@ -0,0 +1,18 @@
+"""
+Management command to rebuild the JobRecommendation table from scratch.
+
+The table is normally kept up to date incrementally; run this after bulk
+imports or to repair it.
+Example: python manage.py rebuild_job_recommendations
+"""
+
+from django.core.management.base import BaseCommand
+from jobs import recommendations
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized seeker/job recommendation table'
+
+    def handle(self, *args, **options):
+        total = recommendations.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} job recommendation(s)'))
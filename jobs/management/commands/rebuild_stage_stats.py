@@ -0,0 +1,19 @@
+"""
+Management command to rebuild the per-job funnel rollup (JobStageStats)
+from the application status event log.
+
+The rollup is normally kept up to date as statuses change; run this once
+after migrating, after bulk imports, or to repair it.
+Example: python manage.py rebuild_stage_stats
+"""
+
+from django.core.management.base import BaseCommand
+from jobs import funnel
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-job stage counts and time-in-stage histograms from the status event log'
+
+    def handle(self, *args, **options):
+        total = funnel.rebuild_stage_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} job stage stat(s)'))
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def populate_job_skills(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobSkill = apps.get_model('jobs', 'JobSkill')
+    rows = []
+    for job_id, skills in Job.objects.values_list('id', 'skills').iterator():
+        names = {s.strip().lower()[:200] for s in (skills or '').split(',') if s.strip()}
+        rows.extend(JobSkill(job_id=job_id, name=name) for name in names)
+    JobSkill.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+def clear_job_skills(apps, schema_editor):
+    apps.get_model('jobs', 'JobSkill').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_jobskill'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_job_skills, clear_job_skills),
+    ]
@@ -0,0 +1,75 @@
+from django.db import migrations
+
+# FTS5 mirror of the searchable Job columns, used by jobs.search.SQLiteFTSSearchBackend.
+# It is an external-content table, so triggers keep the index in step with jobs_job.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE jobs_job_fts USING fts5(
+        title, description, skills, company, location,
+        content='jobs_job', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER jobs_job_fts_ai AFTER INSERT ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(rowid, title, description, skills, company, location)
+        VALUES (new.id, new.title, new.description, new.skills, new.company, new.location);
+    END
+    """,
+    """
+    CREATE TRIGGER jobs_job_fts_ad AFTER DELETE ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, description, skills, company, location)
+        VALUES ('delete', old.id, old.title, old.description, old.skills, old.company, old.location);
+    END
+    """,
+    """
+    CREATE TRIGGER jobs_job_fts_au AFTER UPDATE OF title, description, skills, company, location ON jobs_job BEGIN
+        INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, description, skills, company, location)
+        VALUES ('delete', old.id, old.title, old.description, old.skills, old.company, old.location);
+        INSERT INTO jobs_job_fts(rowid, title, description, skills, company, location)
+        VALUES (new.id, new.title, new.description, new.skills, new.company, new.location);
+    END
+    """,
+    "INSERT INTO jobs_job_fts(jobs_job_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS jobs_job_fts_au",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_ad",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_ai",
+    "DROP TABLE IF EXISTS jobs_job_fts",
+]
+
+
+def fts5_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_job_fts(apps, schema_editor):
+    # Other databases keep using the ORM search backend
+    if not fts5_supported(schema_editor.connection):
+        return
+    for sql in CREATE_FTS:
+        schema_editor.execute(sql)
+
+
+def drop_job_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_FTS:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_populate_jobskill'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_job_fts, drop_job_fts),
+    ]
@@ -0,0 +1,74 @@
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db import migrations
+
+# Frozen copy of jobs.funnel.BUCKET_BOUNDS
+BUCKET_BOUNDS = [60 * 2 ** (i / 2) for i in range(40)]
+
+
+def backfill_status_events(apps, schema_editor):
+    # Only the first and current status of existing applications are known
+    Application = apps.get_model('jobs', 'Application')
+    ApplicationStatusEvent = apps.get_model('jobs', 'ApplicationStatusEvent')
+    rows = []
+    for app_id, job_id, status, applied_at, updated_at in Application.objects.values_list(
+        'id', 'job_id', 'status', 'applied_at', 'updated_at'
+    ).iterator():
+        rows.append(ApplicationStatusEvent(
+            application_id=app_id, job_id=job_id, to_status='applied', created_at=applied_at,
+        ))
+        if status != 'applied':
+            rows.append(ApplicationStatusEvent(
+                application_id=app_id, job_id=job_id, from_status='applied', to_status=status,
+                created_at=updated_at,
+            ))
+    ApplicationStatusEvent.objects.bulk_create(rows, batch_size=1000)
+
+
+def clear_status_events(apps, schema_editor):
+    apps.get_model('jobs', 'ApplicationStatusEvent').objects.all().delete()
+
+
+def build_stage_stats(apps, schema_editor):
+    # Same computation as jobs.funnel.rebuild_stage_stats, over the events written above
+    ApplicationStatusEvent = apps.get_model('jobs', 'ApplicationStatusEvent')
+    JobStageStats = apps.get_model('jobs', 'JobStageStats')
+    entered = defaultdict(int)
+    histograms = defaultdict(lambda: [0] * (len(BUCKET_BOUNDS) + 1))
+    previous = {}
+    events = ApplicationStatusEvent.objects.order_by('application_id', 'created_at', 'id').values_list(
+        'application_id', 'job_id', 'to_status', 'created_at'
+    )
+    for application_id, job_id, to_status, created_at in events.iterator():
+        if application_id in previous:
+            prev_status, prev_at = previous[application_id]
+            seconds = max((created_at - prev_at).total_seconds(), 0)
+            histograms[(job_id, prev_status)][bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        entered[(job_id, to_status)] += 1
+        previous[application_id] = (to_status, created_at)
+
+    rows = []
+    for job_id, status in set(entered) | set(histograms):
+        histogram = histograms.get((job_id, status))
+        rows.append(JobStageStats(
+            job_id=job_id, status=status, entered=entered.get((job_id, status), 0),
+            exited=sum(histogram) if histogram else 0, duration_histogram=histogram or [],
+        ))
+    JobStageStats.objects.bulk_create(rows, batch_size=1000)
+
+
+def clear_stage_stats(apps, schema_editor):
+    apps.get_model('jobs', 'JobStageStats').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_applicationstatusevent_jobstagestats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_status_events, clear_status_events),
+        migrations.RunPython(build_stage_stats, clear_stage_stats),
+    ]
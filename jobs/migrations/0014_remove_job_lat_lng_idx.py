@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_backfill_status_events'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_job_lat_lng_idx',
+        ),
+    ]
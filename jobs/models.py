@@ -1,6 +1,7 @@
 # jobs/models.py
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class Job(models.Model):
     id = models.AutoField(primary_key=True)
@@ -33,9 +34,28 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order of the job listing
+            models.Index(fields=['-created_at', '-id'], name='jobs_job_created_id_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
+    def sync_skills(self):
+        """
+        Bring the JobSkill rows for this job in line with the free-text skills field
+        (run on every save by jobs.signals); returns whether any row changed
+        """
+        names = parse_skills(self.skills)
+        existing = set(self.skill_tags.values_list('name', flat=True))
+        stale = existing - names
+        if stale:
+            self.skill_tags.filter(name__in=stale).delete()
+        JobSkill.objects.bulk_create([JobSkill(job=self, name=name) for name in names - existing])
+        return bool(stale or names - existing)
+
 class Application(models.Model):
     STATUS_CHOICES = (
         ('applied', 'Applied'),
@@ -70,3 +90,71 @@ class SavedJob(models.Model):
     
     def __str__(self):
         return f"{self.user.username} saved {self.job.title}"
+
+def normalize_skill(name):
+    """The form a skill name is stored and compared in: trimmed, lowercase, truncated to fit JobSkill.name"""
+    return name.strip().lower()[:JobSkill.NAME_MAX_LENGTH]
+
+def parse_skills(skills_text):
+    """Split a comma-separated skills string into a set of normalized (lowercase) names"""
+    return {
+        normalize_skill(s)
+        for s in (skills_text or "").split(",")
+        if s.strip()
+    }
+
+class JobSkill(models.Model):
+    """One normalized skill of a job, kept in sync with Job.skills so skill filters can use an index"""
+    NAME_MAX_LENGTH = 200
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='skill_tags')
+    name = models.CharField(max_length=NAME_MAX_LENGTH, db_index=True)
+
+    class Meta:
+        unique_together = ('job', 'name')
+
+    def __str__(self):
+        return f"{self.job.title}: {self.name}"
+
+class JobRecommendation(models.Model):
+    """Materialized skill overlap between a seeker and a job, maintained by jobs.recommendations"""
+    seeker = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='job_recommendations')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='recommendations')
+    overlap_score = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('seeker', 'job')
+
+    def __str__(self):
+        return f"{self.job.title} for {self.seeker.username} ({self.overlap_score})"
+
+class ApplicationStatusEvent(models.Model):
+    """Append-only log of the statuses an application has moved through, written by jobs.funnel"""
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='status_events')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='status_events')
+    from_status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES, blank=True, help_text="Blank for the initial status")
+    to_status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['application', 'created_at'], name='jobs_status_event_app_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.application_id}: {self.from_status or '-'} -> {self.to_status}"
+
+class JobStageStats(models.Model):
+    """Per-job rollup of the status event log: stage entries, exits and a time-in-stage histogram"""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='stage_stats')
+    status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    entered = models.PositiveIntegerField(default=0)
+    exited = models.PositiveIntegerField(default=0)
+    duration_histogram = models.JSONField(default=list, help_text="Exits counted per jobs.funnel duration bucket")
+
+    class Meta:
+        unique_together = ('job', 'status')
+
+    def __str__(self):
+        return f"{self.job.title}: {self.status} ({self.entered} in, {self.exited} out)"
@@ -0,0 +1,87 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of OFFSET, each page continues strictly after the last row of the
+previous one, so the cost of a page does not depend on how deep it is.
+The cursor is an opaque, URL-safe token holding the ordering values of
+that last row. The ordering must end with a unique field (``-id``) so it
+is total and pages never skip or repeat rows.
+"""
+import base64
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+PAGE_SIZE = 20
+
+# Newest first, with id as the tie breaker for jobs created in the same instant
+DEFAULT_ORDERING = ('-created_at', '-id')
+
+
+class _CursorEncoder(json.JSONEncoder):
+    # Unlike DjangoJSONEncoder, keep full microsecond precision so rows are never skipped
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.date)):
+            return o.isoformat()
+        if isinstance(o, Decimal):
+            return str(o)
+        return super().default(o)
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, cls=_CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Return the list of ordering values in ``cursor``, or None if it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+def _after(ordering, values):
+    """Q matching rows that sort strictly after ``values`` under ``ordering``"""
+    condition = Q()
+    for i, key in enumerate(ordering):
+        field = key.lstrip('-')
+        lookup = 'lt' if key.startswith('-') else 'gt'
+        step = Q(**{f'{field}__{lookup}': values[i]})
+        for prev_key, prev_value in zip(ordering[:i], values[:i]):
+            step &= Q(**{prev_key.lstrip('-'): prev_value})
+        condition |= step
+    return condition
+
+
+def keyset_page(queryset, cursor=None, ordering=DEFAULT_ORDERING, page_size=PAGE_SIZE):
+    """
+    Return ``(items, next_cursor)`` for the page that starts after ``cursor``.
+    ``next_cursor`` is None on the last page.
+    """
+    ordering = tuple(ordering)
+    queryset = queryset.order_by(*ordering)
+    position = decode_cursor(cursor, len(ordering))
+    if position is not None:
+        try:
+            queryset = queryset.filter(_after(ordering, position))
+        except (ValueError, TypeError, ValidationError):
+            # A tampered cursor whose values don't fit the fields: start from the top
+            pass
+
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, key.lstrip('-')) for key in ordering])
+    return items, next_cursor
@@ -0,0 +1,70 @@
+"""
+Maintenance of the JobRecommendation table.
+
+A seeker is recommended a job when at least MIN_OVERLAP of their profile
+skills appear in the job's skills (compared case-insensitively). Rows are
+refreshed for one job when it is created or edited, for one seeker when
+their profile skills change, and rebuilt in full by the
+``rebuild_job_recommendations`` management command.
+"""
+from django.db import transaction
+from django.db.models import Count
+
+from accounts.models import Profile, Skill
+from .models import JobRecommendation, JobSkill
+
+MIN_OVERLAP = 2
+
+
+def _seeker_skill_names(user):
+    return set(Skill.objects.filter(profile__user=user).values_list('name_normalized', flat=True))
+
+
+def refresh_for_seeker(user):
+    """Recompute every recommendation of one seeker"""
+    if getattr(user, 'role', None) != 'seeker':
+        return
+    overlaps = (
+        JobSkill.objects.filter(name__in=_seeker_skill_names(user))
+        .values('job_id')
+        .annotate(overlap=Count('id'))
+        .filter(overlap__gte=MIN_OVERLAP)
+        .values_list('job_id', 'overlap')
+    )
+    with transaction.atomic():
+        JobRecommendation.objects.filter(seeker=user).delete()
+        JobRecommendation.objects.bulk_create([
+            JobRecommendation(seeker=user, job_id=job_id, overlap_score=overlap)
+            for job_id, overlap in overlaps
+        ])
+
+
+def refresh_for_job(job):
+    """Recompute the recommendations of one job against every seeker"""
+    job_skill_names = set(job.skill_tags.values_list('name', flat=True))
+    skill_ids = Skill.objects.filter(name_normalized__in=job_skill_names).values('id')
+    overlaps = (
+        Profile.skills.through.objects.filter(
+            skill_id__in=skill_ids,
+            profile__user__role='seeker',
+        )
+        .values('profile__user_id')
+        .annotate(overlap=Count('skill_id'))
+        .filter(overlap__gte=MIN_OVERLAP)
+        .values_list('profile__user_id', 'overlap')
+    )
+    with transaction.atomic():
+        JobRecommendation.objects.filter(job=job).delete()
+        JobRecommendation.objects.bulk_create([
+            JobRecommendation(seeker_id=seeker_id, job=job, overlap_score=overlap)
+            for seeker_id, overlap in overlaps
+        ])
+
+
+def rebuild_all():
+    """Throw away and recompute the whole table; returns the number of rows written"""
+    with transaction.atomic():
+        JobRecommendation.objects.all().delete()
+        for profile in Profile.objects.filter(user__role='seeker').select_related('user').iterator():
+            refresh_for_seeker(profile.user)
+    return JobRecommendation.objects.count()
@@ -0,0 +1,103 @@
+"""
+Full-text search over job postings.
+
+The listing view asks ``get_search_backend()`` for a backend and calls
+``search(queryset, text, fields=None, ranked=False)`` on it. The default
+backend uses the SQLite FTS5 table created in migration 0008 (kept current
+by triggers on ``jobs_job``) and falls back to the plain ORM ``icontains``
+filters on databases where that table is not available.
+
+Set ``JOB_SEARCH_BACKEND`` in settings to a dotted path to swap backends.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+FTS_TABLE = "jobs_job_fts"
+
+# Columns of the FTS table, in order; these match the Job model fields they mirror
+SEARCH_FIELDS = ("title", "description", "skills", "company", "location")
+
+# bm25() column weights, same order as SEARCH_FIELDS
+FIELD_WEIGHTS = (10.0, 1.0, 5.0, 2.0, 2.0)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(text):
+    """Split free text into the words every backend matches on"""
+    return _WORD_RE.findall(text or "")
+
+
+class ORMSearchBackend:
+    """Portable backend: every term must appear (case-insensitively) in one of the fields"""
+
+    def search(self, queryset, text, fields=None, ranked=False):
+        fields = fields or SEARCH_FIELDS
+        for term in search_terms(text):
+            term_q = Q()
+            for field in fields:
+                term_q |= Q(**{f"{field}__icontains": term})
+            queryset = queryset.filter(term_q)
+        return queryset
+
+
+class SQLiteFTSSearchBackend(ORMSearchBackend):
+    """BM25-ranked prefix search on the FTS5 mirror of the Job table"""
+
+    _available = None
+
+    def is_available(self):
+        if SQLiteFTSSearchBackend._available is None:
+            SQLiteFTSSearchBackend._available = (
+                connection.vendor == "sqlite"
+                and FTS_TABLE in connection.introspection.table_names()
+            )
+        return SQLiteFTSSearchBackend._available
+
+    def match_expression(self, text, fields=None):
+        # Quote each word so FTS operators typed by users are treated as text, and
+        # make it a prefix query so "dev" finds "developer"
+        terms = " ".join(f'"{term}"*' for term in search_terms(text))
+        if not terms:
+            return ""
+        if fields:
+            return "{%s} : (%s)" % (" ".join(fields), terms)
+        return terms
+
+    def search(self, queryset, text, fields=None, ranked=False):
+        if not self.is_available():
+            return super().search(queryset, text, fields=fields, ranked=ranked)
+
+        match = self.match_expression(text, fields)
+        if not match:
+            return queryset
+
+        queryset = queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        )
+        if ranked:
+            weights = ", ".join(str(w) for w in FIELD_WEIGHTS)
+            queryset = queryset.annotate(
+                search_rank=RawSQL(
+                    f"SELECT bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+                    f"WHERE {FTS_TABLE} MATCH %s AND rowid = jobs_job.id",
+                    [match],
+                )
+            ).order_by("search_rank", "-created_at")
+        return queryset
+
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "JOB_SEARCH_BACKEND", "jobs.search.SQLiteFTSSearchBackend")
+        _backend = import_string(path)()
+    return _backend
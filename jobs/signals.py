@@ -0,0 +1,42 @@
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import Profile
+from home.views import invalidate_job_tiles
+from jobfinder.geo import job_index
+from . import recommendations
+from .models import Job
+
+
+@receiver(m2m_changed, sender=Profile.skills.through)
+def refresh_recommendations_on_skill_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep a seeker's job recommendations in step with their profile skills"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        recommendations.refresh_for_seeker(instance.user)
+    elif pk_set:
+        # Skill.profile_set was edited: refresh every profile that was touched
+        for profile in Profile.objects.filter(pk__in=pk_set).select_related('user'):
+            recommendations.refresh_for_seeker(profile.user)
+
+
+@receiver(post_save, sender=Job)
+def sync_job_skills(sender, instance, raw=False, **kwargs):
+    """Keep JobSkill rows and the job's recommendations in step with Job.skills, however it is saved"""
+    if raw:
+        return
+    if instance.sync_skills():
+        recommendations.refresh_for_job(instance)
+
+
+@receiver(post_save, sender=Job)
+def update_job_geo_index(sender, instance, **kwargs):
+    previous, point = job_index.upsert(instance.id, instance.latitude, instance.longitude)
+    # Cached map tiles also carry titles and companies, so drop them even if the job did not move
+    invalidate_job_tiles(previous, point)
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_geo_index(sender, instance, **kwargs):
+    invalidate_job_tiles(job_index.remove(instance.id))
@@ -1,3 +1,175 @@
+import datetime
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from . import funnel
+from .models import Application, ApplicationStatusEvent, Job, JobStageStats
+from .pagination import decode_cursor, encode_cursor, keyset_page
+
+
+class BulkApplicationStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = CustomUser.objects.create_user('recruiter', password='pw', role='recruiter')
+        other = CustomUser.objects.create_user('other', password='pw', role='recruiter')
+        cls.job = Job.objects.create(title='Developer', skills='python', posted_by=cls.recruiter)
+        other_job = Job.objects.create(title='Designer', skills='figma', posted_by=other)
+        seekers = [CustomUser.objects.create_user(f'seeker{i}', password='pw', role='seeker') for i in range(3)]
+        cls.applied = Application.objects.create(job=cls.job, applicant=seekers[0])
+        cls.in_review = Application.objects.create(job=cls.job, applicant=seekers[1], status='review')
+        cls.not_mine = Application.objects.create(job=other_job, applicant=seekers[2])
+
+    def setUp(self):
+        self.client.force_login(self.recruiter)
+
+    def move(self, ids, status='review', **extra):
+        return self.client.post(
+            reverse('jobs.bulk_update_application_status'),
+            {'application_ids': ids, 'status': status, **extra},
+        )
+
+    def test_moves_own_applications_and_reports_each_id(self):
+        response = self.move([str(self.applied.id), str(self.in_review.id), str(self.not_mine.id)])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['updated'], 1)
+        self.assertEqual(data['results'], {
+            str(self.applied.id): 'updated',
+            str(self.in_review.id): 'unchanged',
+            str(self.not_mine.id): 'not_found',
+        })
+        self.assertEqual(data['counts']['review'], 2)
+        self.applied.refresh_from_db()
+        self.not_mine.refresh_from_db()
+        self.assertEqual(self.applied.status, 'review')
+        # Another recruiter's application is left alone
+        self.assertEqual(self.not_mine.status, 'applied')
+
+    def test_malformed_and_oversized_ids_are_not_found(self):
+        malformed = ['²', 'abc', '-1', '0', ' 1', '1.0', '99999999999999999999', str(2 ** 63)]
+        response = self.move([*malformed, str(self.applied.id)], job_id='99999999999999999999')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['results'], {
+            **{app_id: 'not_found' for app_id in malformed},
+            str(self.applied.id): 'updated',
+        })
+        self.assertEqual(data['updated'], 1)
+
+    def test_invalid_status_is_rejected(self):
+        response = self.move([str(self.applied.id)], status='hired')
+        self.assertEqual(response.status_code, 400)
+        self.applied.refresh_from_db()
+        self.assertEqual(self.applied.status, 'applied')
+
+
+class KeysetPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        recruiter = CustomUser.objects.create_user('recruiter', password='pw', role='recruiter')
+        Job.objects.bulk_create([Job(title=f'Job {i}', posted_by=recruiter) for i in range(25)])
+        # Most jobs share a creation time, so only the id keeps their order total
+        now = timezone.now().replace(microsecond=123456)
+        jobs = list(Job.objects.order_by('id'))
+        Job.objects.filter(pk__in=[job.pk for job in jobs[:20]]).update(created_at=now)
+        for i, job in enumerate(jobs[20:]):
+            Job.objects.filter(pk=job.pk).update(created_at=now - datetime.timedelta(microseconds=i + 1))
+        cls.expected = list(Job.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def test_cursor_round_trip(self):
+        values = [timezone.now(), 42]
+        cursor = encode_cursor(values)
+        self.assertRegex(cursor, r'^[A-Za-z0-9_-]+$')
+        self.assertEqual(decode_cursor(cursor, 2), [values[0].isoformat(), 42])
+        # The cursor must carry as many values as the ordering has keys
+        self.assertIsNone(decode_cursor(cursor, 3))
+
+    def test_pages_through_ties_without_skipping_or_repeating(self):
+        ids = []
+        cursor = None
+        while True:
+            items, cursor = keyset_page(Job.objects.all(), cursor, page_size=7)
+            self.assertLessEqual(len(items), 7)
+            ids += [job.id for job in items]
+            if cursor is None:
+                break
+        self.assertEqual(ids, self.expected)
+
+    def test_garbage_cursor_starts_from_the_top(self):
+        first_page = [job.id for job in keyset_page(Job.objects.all(), page_size=5)[0]]
+        for cursor in ('garbage', '!!!', encode_cursor({'a': 1}), encode_cursor(['not a date', 'x'])):
+            items, next_cursor = keyset_page(Job.objects.all(), cursor, page_size=5)
+            self.assertEqual([job.id for job in items], first_page)
+            self.assertIsNotNone(next_cursor)
+
+
+class FunnelTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        recruiter = CustomUser.objects.create_user('recruiter', password='pw', role='recruiter')
+        cls.job = Job.objects.create(title='Developer', skills='python', posted_by=recruiter)
+        cls.applications = []
+        for i in range(3):
+            seeker = CustomUser.objects.create_user(f'seeker{i}', password='pw', role='seeker')
+            application = Application.objects.create(job=cls.job, applicant=seeker)
+            funnel.record_applied(application)
+            cls.applications.append(application)
+
+    def stats(self, status):
+        return JobStageStats.objects.get(job=self.job, status=status)
+
+    def test_record_transitions_logs_moves_and_rolls_up_durations(self):
+        first, second, third = self.applications
+        at = first.applied_at + datetime.timedelta(hours=2)
+        third.status = 'review'
+        funnel.record_transitions([first, second, third], 'review', at=at)
+
+        # third was already in review and is skipped
+        moves = ApplicationStatusEvent.objects.filter(to_status='review')
+        self.assertEqual(sorted(moves.values_list('application_id', flat=True)), [first.id, second.id])
+        self.assertTrue(all(event.from_status == 'applied' and event.created_at == at for event in moves))
+        self.assertEqual(self.stats('applied').entered, 3)
+        self.assertEqual(self.stats('applied').exited, 2)
+        self.assertEqual(self.stats('review').entered, 2)
+        self.assertEqual(self.stats('review').exited, 0)
+        # Both stayed about two hours in "applied", timed from their applied event
+        histogram = self.stats('applied').duration_histogram
+        self.assertEqual(sum(histogram), 2)
+        self.assertAlmostEqual(funnel.histogram_median(histogram), 7200, delta=7200 * 0.2)
+
+        # The next move is timed from the event just logged
+        first.status = 'review'
+        funnel.record_transitions([first], 'interview', at=at + datetime.timedelta(days=3))
+        median = funnel.stage_summary([self.job.id])['review']['median_seconds']
+        self.assertAlmostEqual(median, 3 * 86400, delta=3 * 86400 * 0.2)
+
+    def test_rebuild_matches_incremental_rollup(self):
+        first, second, _ = self.applications
+        funnel.record_transitions([first, second], 'review', at=first.applied_at + datetime.timedelta(minutes=30))
+        incremental = {
+            stats.status: (stats.entered, stats.exited, stats.duration_histogram)
+            for stats in JobStageStats.objects.filter(job=self.job)
+        }
+        funnel.rebuild_stage_stats()
+        rebuilt = {
+            stats.status: (stats.entered, stats.exited, stats.duration_histogram)
+            for stats in JobStageStats.objects.filter(job=self.job)
+        }
+        self.assertEqual(rebuilt, incremental)
 
-# Create your tests here.
+    def test_histogram_median(self):
+        self.assertIsNone(funnel.histogram_median([]))
+        self.assertIsNone(funnel.histogram_median([0] * (len(funnel.BUCKET_BOUNDS) + 1)))
+        durations = [45, 90, 600, 3600, 4000, 5000, 86400, 10 ** 9]
+        histogram = [0] * (len(funnel.BUCKET_BOUNDS) + 1)
+        for seconds in durations:
+            histogram[funnel.duration_bucket(seconds)] += 1
+        # Lower median of the eight: the fourth shortest
+        self.assertAlmostEqual(funnel.histogram_median(histogram), 3600, delta=3600 * 0.2)
+        # Stays longer than the last bound land in the open bucket
+        self.assertEqual(funnel.duration_bucket(10 ** 9), len(funnel.BUCKET_BOUNDS))
+        only_open = [0] * len(funnel.BUCKET_BOUNDS) + [1]
+        self.assertEqual(funnel.histogram_median(only_open), funnel.BUCKET_BOUNDS[-1])
@@ -18,6 +18,7 @@ urlpatterns = [
     path('pipeline/<int:job_id>/', views.pipeline, name='jobs.pipeline_job'),
     path('applications/<int:application_id>/', views.application_detail, name='jobs.application_detail'),
     path('applications/<int:application_id>/update/', views.update_application_status, name='jobs.update_application_status'),
+    path('applications/bulk-update/', views.bulk_update_application_status, name='jobs.bulk_update_application_status'),
     
     # Bookmark URLs
     path('<int:job_id>/save/', views.toggle_save_job, name='jobs.toggle_save'),
@@ -1,11 +1,22 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.db.models import Case, When, IntegerField
-from .models import Job, Application, SavedJob
+from django.db.models import Case, When, IntegerField, Count
+from .models import Job, Application, SavedJob, JobSkill, parse_skills
+from .search import get_search_backend
+from .pagination import keyset_page, DEFAULT_ORDERING
+from . import funnel
 from accounts.models import Profile
+from jobfinder import events
+from jobfinder.geo import job_index
 from django.http import JsonResponse
-from django.views.decorators.http import require_GET
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET, require_POST
+from django.db import transaction
+from django.utils import timezone
+
+# Pipeline columns list applications in the order they came in
+PIPELINE_ORDERING = ('applied_at', 'id')
 
 def is_seeker(user):
     return user.is_authenticated and getattr(user, "role", None) == "seeker"
@@ -17,9 +28,12 @@ def index(request):
     user_applications = []
     user_saved_jobs = []
     filter_applied = 0
+    sections = {}
+    ordering = DEFAULT_ORDERING
 
     if request.user.role == 'seeker':
         # Apply filters for job seekers
+        query = request.GET.get('q', '').strip()
         title = request.GET.get('title', '').strip()
         skills = request.GET.get('skills', '').strip()
         location = request.GET.get('location', '').strip()
@@ -28,14 +42,22 @@ def index(request):
         remote_or_on_site = request.GET.get('remote_or_on_site', '')
         visa_sponsorship = request.GET.get('visa_sponsorship', '')
 
+        search_backend = get_search_backend()
+        if query:
+            jobs = search_backend.search(jobs, query, ranked=True)
         if title:
-            jobs = jobs.filter(title__icontains=title)
-        if skills:
-            for skill in skills.split(','):
-                skill = skill.strip()
-                jobs = jobs.filter(skills__icontains=skill)
+            jobs = search_backend.search(jobs, title, fields=['title'])
+        skill_names = parse_skills(skills)
+        if skill_names:
+            # Jobs tagged with every requested skill: one grouped lookup on the indexed JobSkill table
+            jobs_with_all_skills = JobSkill.objects.filter(
+                name__in=skill_names
+            ).values('job_id').annotate(
+                matched=Count('id')
+            ).filter(matched=len(skill_names)).values('job_id')
+            jobs = jobs.filter(id__in=jobs_with_all_skills)
         if location:
-            jobs = jobs.filter(location__icontains=location)
+            jobs = search_backend.search(jobs, location, fields=['location'])
         if min_salary:
             jobs = jobs.filter(salary__gte=min_salary)
         if max_salary:
@@ -57,17 +79,12 @@ def index(request):
         ).values_list('job_id', flat=True)
 
         # Job Recommendation functionality
-        recommended_jobs = []
-        other_jobs = []
         # check if user created a profile
-        try:
-            user_profile = Profile.objects.get(user=request.user)
-        except Profile.DoesNotExist:
-            other_jobs = list(jobs)
+        if not Profile.objects.filter(user=request.user).exists():
+            sections['other'] = jobs
         else:
-            user_skills = {s.name.lower().strip() for s in user_profile.skills.all()}
-
             used_filters = any([
+                query,
                 title,
                 skills,
                 location,
@@ -80,43 +97,61 @@ def index(request):
             # if a filter is used then do not apply the recommendation job functionality
             if used_filters:
                 filter_applied = 1
-                other_jobs = list(jobs)
+                sections['other'] = jobs
             else:
-                for job in jobs:
-                    job_skill_names = {
-                        s.lower().strip()
-                        for s in job.skills.split(",")
-                        if s.strip() != ""
-                    }
+                # Recommendations are materialized in JobRecommendation (see jobs.recommendations)
+                sections['recommended'] = jobs.filter(recommendations__seeker=request.user)
+                sections['other'] = jobs.exclude(recommendations__seeker=request.user)
 
-                    overlap = len(user_skills & job_skill_names)
-
-                    if overlap >= 2:
-                        recommended_jobs.append(job)
-                    else:
-                        other_jobs.append(job)
+        if query:
+            ordering = ('search_rank',) + DEFAULT_ORDERING
 
     elif request.user.role == 'recruiter':
-        jobs = jobs.annotate(
+        # The recruiter's own postings first
+        sections['other'] = jobs.annotate(
             is_mine=Case(
                 When(posted_by=request.user, then=0),
                 default=1,
                 output_field=IntegerField()
             )
-        ).order_by('is_mine', '-created_at')
+        )
+        ordering = ('is_mine',) + DEFAULT_ORDERING
 
-        recommended_jobs = []
-        other_jobs = list(jobs)
+    # Each section is paged separately by keyset; ?section=&cursor= continues one of them
+    requested_section = request.GET.get('section', '')
+    cursor = request.GET.get('cursor', '')
+    pages = {}
+    for name, section_jobs in sections.items():
+        section_cursor = cursor if name == requested_section else None
+        pages[name] = keyset_page(section_jobs.select_related('posted_by'), section_cursor, ordering)
+
+    page_query = request.GET.copy()
+    for key in ('section', 'cursor', 'format'):
+        page_query.pop(key, None)
 
     template_data = {
         'title': 'Jobs',
         'filters': filters,
         'user_applications': user_applications,
         'user_saved_jobs': user_saved_jobs,
-        'recommended_jobs': recommended_jobs,
-        'other_jobs': other_jobs,
+        'recommended_jobs': pages.get('recommended', ([], None))[0],
+        'recommended_next_cursor': pages.get('recommended', ([], None))[1],
+        'other_jobs': pages.get('other', ([], None))[0],
+        'other_next_cursor': pages.get('other', ([], None))[1],
+        'page_query': page_query.urlencode(),
         'filter_applied': filter_applied,
     }
+
+    # "Load more": only the next cards of one section, as an HTML fragment
+    if request.GET.get('format') == 'json' and requested_section in pages:
+        section_jobs, next_cursor = pages[requested_section]
+        html = render_to_string('jobs/job_card_list.html', {
+            'template_data': template_data,
+            'jobs': section_jobs,
+            'recommended': requested_section == 'recommended',
+        }, request=request)
+        return JsonResponse({'html': html, 'next_cursor': next_cursor})
+
     return render(request, 'jobs/job_listings.html', {'template_data': template_data})
 
 
@@ -211,6 +246,7 @@ def apply_to_job(request, job_id):
             applicant=request.user,
             cover_letter=cover_letter
         )
+        funnel.record_applied(application)
         
         messages.success(request, f'Successfully applied to {job.title}!')
         return redirect('jobs.my_applications')
@@ -240,6 +276,37 @@ def manage_applications(request):
     
     return render(request, 'jobs/manage_applications.html', {'template_data': template_data})
 
+def _pipeline_job_stats(recruiter, recruiter_jobs):
+    """Application counts per job and status, from one grouped query"""
+    job_stats = {
+        job.id: {
+            'total': 0,
+            'by_status': {status_code: 0 for status_code, status_label in Application.STATUS_CHOICES}
+        }
+        for job in recruiter_jobs
+    }
+    status_counts = (
+        Application.objects.filter(job__posted_by=recruiter)
+        .values('job_id', 'status')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for row in status_counts:
+        stats = job_stats[row['job_id']]
+        stats['total'] += row['count']
+        if row['status'] in stats['by_status']:
+            stats['by_status'][row['status']] = row['count']
+    return job_stats
+
+def _pipeline_column_counts(job_stats, job_id=None):
+    """Totals of each pipeline column, for one job or all of them"""
+    if job_id is not None:
+        return dict(job_stats[job_id]['by_status'])
+    return {
+        status_code: sum(stats['by_status'][status_code] for stats in job_stats.values())
+        for status_code, status_label in Application.STATUS_CHOICES
+    }
+
 @login_required
 @user_passes_test(is_recruiter)
 def pipeline(request, job_id=None):
@@ -247,6 +314,8 @@ def pipeline(request, job_id=None):
     Kanban board view for managing applications in a pipeline.
     If job_id is provided, shows applications for that specific job.
     Otherwise, shows all applications for all jobs posted by the recruiter.
+    Each column starts with its first page of cards; ?column=&cursor=&format=json
+    returns the next page of one column as an HTML fragment.
     """
     # Get all jobs posted by this recruiter
     recruiter_jobs = Job.objects.filter(posted_by=request.user)
@@ -255,38 +324,46 @@ def pipeline(request, job_id=None):
     selected_job = None
     if job_id:
         selected_job = get_object_or_404(Job, id=job_id, posted_by=request.user)
-        applications = Application.objects.filter(job=selected_job).select_related('applicant', 'job').prefetch_related('applicant__profile__skills')
+        applications = Application.objects.filter(job=selected_job)
     else:
         # Show all applications for all jobs
-        applications = Application.objects.filter(job__in=recruiter_jobs).select_related('applicant', 'job').prefetch_related('applicant__profile__skills')
-    
-    # Organize applications by status
-    status_columns = {
-        'applied': [],
-        'review': [],
-        'interview': [],
-        'offer': [],
-        'closed': []
-    }
-    
-    for app in applications:
-        if app.status in status_columns:
-            status_columns[app.status].append(app)
-    
-    # Get job statistics
-    job_stats = {}
-    for job in recruiter_jobs:
-        job_apps = Application.objects.filter(job=job)
-        job_stats[job.id] = {
-            'total': job_apps.count(),
-            'by_status': {}
-        }
-        for status_code, status_label in Application.STATUS_CHOICES:
-            job_stats[job.id]['by_status'][status_code] = job_apps.filter(status=status_code).count()
+        applications = Application.objects.filter(job__posted_by=request.user)
+    applications = applications.select_related(
+        'applicant', 'applicant__profile', 'job'
+    ).prefetch_related('applicant__profile__skills')
+    
+    # "Load more": only the next cards of one column
+    requested_column = request.GET.get('column', '')
+    if request.GET.get('format') == 'json' and requested_column in dict(Application.STATUS_CHOICES):
+        column_applications, next_cursor = keyset_page(
+            applications.filter(status=requested_column), request.GET.get('cursor', ''), PIPELINE_ORDERING
+        )
+        html = render_to_string('jobs/pipeline_card_list.html', {'applications': column_applications}, request=request)
+        return JsonResponse({'html': html, 'next_cursor': next_cursor})
+    
+    recruiter_jobs = list(recruiter_jobs)
+    job_stats = _pipeline_job_stats(request.user, recruiter_jobs)
+    
+    # First page of each column; the badges show the full counts
+    column_counts = _pipeline_column_counts(job_stats, selected_job.id if selected_job else None)
+    stage_summary = funnel.stage_summary([selected_job.id] if selected_job else list(job_stats))
+    columns = []
+    for status_code, status_label in Application.STATUS_CHOICES:
+        column_applications, next_cursor = keyset_page(
+            applications.filter(status=status_code), None, PIPELINE_ORDERING
+        )
+        columns.append({
+            'status': status_code,
+            'label': status_label,
+            'applications': column_applications,
+            'count': column_counts[status_code],
+            'stage': stage_summary.get(status_code),
+            'next_cursor': next_cursor,
+        })
     
     template_data = {
         'title': 'Application Pipeline',
-        'status_columns': status_columns,
+        'columns': columns,
         'status_choices': Application.STATUS_CHOICES,
         'recruiter_jobs': recruiter_jobs,
         'selected_job': selected_job,
@@ -348,8 +425,11 @@ def update_application_status(request, application_id):
     if request.method == 'POST':
         new_status = request.POST.get('status')
         if new_status in dict(Application.STATUS_CHOICES):
-            application.status = new_status
-            application.save()
+            with transaction.atomic():
+                _publish_moves(request.user, [application], new_status)
+                funnel.record_transitions([application], new_status)
+                application.status = new_status
+                application.save(update_fields=['status', 'updated_at'])
             
             # Return JSON response for AJAX requests
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -378,6 +458,81 @@ def update_application_status(request, application_id):
         return redirect('jobs.application_detail', application_id=application_id)
     return redirect('jobs.pipeline')
 
+def _publish_moves(recruiter, applications, new_status):
+    """Tell the recruiter's open pipeline boards about applications (still holding their old status) changing status"""
+    moves = [
+        {'id': app.id, 'job_id': app.job_id, 'from': app.status}
+        for app in applications if app.status != new_status
+    ]
+    if moves:
+        events.publish_to_users([recruiter.id], 'applications_moved', {'status': new_status, 'moves': moves})
+
+# Largest value an id column holds (SQLite INTEGER, BigAutoField)
+MAX_ID = 2 ** 63 - 1
+
+def _parse_id(value):
+    """A positive integer id from request data, or None if ``value`` is not one the database can hold"""
+    if not (value.isascii() and value.isdigit()):
+        return None
+    value = int(value)
+    return value if 0 < value <= MAX_ID else None
+
+@login_required
+@user_passes_test(is_recruiter)
+@require_POST
+def bulk_update_application_status(request):
+    """
+    Move several applications to one status in a single UPDATE.
+    POST ``application_ids`` (repeated) and ``status``, optionally ``job_id`` to scope the
+    returned column counts. Returns a result per ID: "updated", "unchanged" (already in that
+    status) or "not_found" (missing, malformed or not on one of your jobs).
+    """
+    new_status = request.POST.get('status')
+    if new_status not in dict(Application.STATUS_CHOICES):
+        return JsonResponse({'success': False, 'error': 'Invalid status selected.'}, status=400)
+    
+    requested_ids = request.POST.getlist('application_ids')
+    if not requested_ids:
+        return JsonResponse({'success': False, 'error': 'No applications selected.'}, status=400)
+    parsed_ids = {app_id: _parse_id(app_id) for app_id in requested_ids}
+    ids = {app_id for app_id in parsed_ids.values() if app_id is not None}
+    
+    with transaction.atomic():
+        owned_applications = list(
+            Application.objects.filter(id__in=ids, job__posted_by=request.user)
+            .only('id', 'job_id', 'status', 'updated_at')
+        )
+        owned = {app.id: app.status for app in owned_applications}
+        to_update = [app_id for app_id, status in owned.items() if status != new_status]
+        now = timezone.now()
+        _publish_moves(request.user, owned_applications, new_status)
+        funnel.record_transitions(owned_applications, new_status, at=now)
+        updated = Application.objects.filter(id__in=to_update).update(status=new_status, updated_at=now)
+        recruiter_jobs = list(Job.objects.filter(posted_by=request.user).only('id'))
+        job_stats = _pipeline_job_stats(request.user, recruiter_jobs)
+    
+    results = {}
+    for app_id, parsed_id in parsed_ids.items():
+        if parsed_id not in owned:
+            results[app_id] = 'not_found'
+        elif owned[parsed_id] == new_status:
+            results[app_id] = 'unchanged'
+        else:
+            results[app_id] = 'updated'
+    
+    job_id = _parse_id(request.POST.get('job_id', ''))
+    job_id = job_id if job_id in job_stats else None
+    status_display = dict(Application.STATUS_CHOICES)[new_status]
+    return JsonResponse({
+        'success': True,
+        'status': new_status,
+        'status_display': status_display,
+        'updated': updated,
+        'results': results,
+        'counts': _pipeline_column_counts(job_stats, job_id),
+        'message': f'{updated} application(s) moved to {status_display}',
+    })
+
 def job_map(request):
     # Get user's preferred commute radius from their profile
     preferred_radius = 50  # default
@@ -388,12 +543,21 @@ def job_map(request):
         'title': 'Jobs Near Me',
         'preferred_radius': preferred_radius
     }
-    jobs = Job.objects.exclude(latitude__isnull=True).exclude(longitude__isnull=True)
-    return render(request, 'jobs/job_map.html', {'template_data': template_data, 'jobs': jobs})
+    # Markers are fetched by the page from the radius API, so no jobs are queried here
+    return render(request, 'jobs/job_map.html', {'template_data': template_data})
 
 @require_GET
 def jobs_geo_api(request):
-    jobs = Job.objects.exclude(latitude__isnull=True).exclude(longitude__isnull=True)
+    # Optional ?bbox=min_lng,min_lat,max_lng,max_lat limits the features to a viewport
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in request.GET['bbox'].split(','))
+    except KeyError:
+        min_lng, min_lat, max_lng, max_lat = -180.0, -90.0, 180.0, 90.0
+    except ValueError:
+        return JsonResponse({"error": "bbox must be min_lng,min_lat,max_lng,max_lat"}, status=400)
+
+    job_ids, _, _ = job_index.bbox(min_lat, min_lng, max_lat, max_lng)
+    jobs = Job.objects.in_bulk(job_ids.tolist())
     features = [{
         "type": "Feature",
         "geometry": {"type": "Point", "coordinates": [float(j.longitude), float(j.latitude)]},
@@ -405,7 +569,7 @@ def jobs_geo_api(request):
             "salary": float(j.salary) if j.salary is not None else None,
             "detail_url": request.build_absolute_uri(f"/jobs/{j.id}/"),
         },
-    } for j in jobs]
+    } for j in (jobs.get(job_id) for job_id in job_ids.tolist()) if j is not None]
     return JsonResponse({"type": "FeatureCollection", "features": features})
 
 